@@ -0,0 +1,191 @@
+# bench.py
+"""Benchmark for InvertedIndex: build throughput, memory and query latency.
+
+Generates a synthetic corpus whose words follow a Zipf distribution (a few
+very common words, a long tail of rare ones), indexes it, then times 1-word,
+2-word and many-word queries. Results are printed as JSON so runs can be
+saved and compared:
+
+    python bench.py --docs 20000 --out before.json
+    python bench.py --docs 20000 --compare before.json
+"""
+import argparse
+import itertools
+import json
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+from index import InvertedIndex
+from stack import Stack
+
+BENCH_VERSION = 1
+
+
+def make_vocab(size):
+    """Distinct pseudo-words w0, w1, ... ranked from most to least frequent."""
+    return [f"w{i}" for i in range(size)]
+
+
+def zipf_weights(size, s):
+    """Cumulative weights of rank r proportional to 1 / r^s."""
+    return list(itertools.accumulate(1 / (r ** s) for r in range(1, size + 1)))
+
+
+def make_corpus(n_docs, vocab, cum_weights, avg_length, rng):
+    """(doc, text) pairs with lengths spread around avg_length."""
+    docs = []
+    for i in range(n_docs):
+        length = max(1, int(rng.expovariate(1 / avg_length)))
+        docs.append((f"doc{i}", " ".join(rng.choices(vocab, cum_weights=cum_weights, k=length))))
+    return docs
+
+
+def make_queries(n, n_words, vocab, cum_weights, rng):
+    """Queries drawn with the corpus distribution, like real query logs."""
+    return [" ".join(rng.choices(vocab, cum_weights=cum_weights, k=n_words)) for _ in range(n)]
+
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    i = min(len(sorted_values) - 1, int(round(p / 100 * (len(sorted_values) - 1))))
+    return sorted_values[i]
+
+
+def time_queries(run, queries):
+    """Latency stats (microseconds) of run(query) over queries."""
+    latencies = []
+    hits = 0
+    for q in queries:
+        start = time.perf_counter()
+        results = run(q)
+        latencies.append((time.perf_counter() - start) * 1e6)
+        hits += bool(results)
+    latencies.sort()
+    return {
+        "queries": len(queries),
+        "with_results": hits,
+        "mean_us": sum(latencies) / len(latencies),
+        "p50_us": percentile(latencies, 50),
+        "p99_us": percentile(latencies, 99),
+        "max_us": latencies[-1],
+    }
+
+
+def build(docs, args):
+    index = InvertedIndex(positional=args.positional)
+    stats = index.add_docs(docs, workers=args.workers)
+    return index, stats
+
+
+def run(args):
+    rng = random.Random(args.seed)
+    vocab = make_vocab(args.vocab)
+    cum_weights = zipf_weights(args.vocab, args.zipf)
+    docs = make_corpus(args.docs, vocab, cum_weights, args.doc_length, rng)
+
+    index, stats = build(docs, args)
+    n_postings = sum(len(p) for p in index.index.values())
+    result = {
+        "bench_version": BENCH_VERSION,
+        "label": args.label,
+        "python": platform.python_version(),
+        "params": {k: v for k, v in vars(args).items() if k not in ("out", "compare", "label")},
+        "build": {
+            "docs": stats["docs"],
+            "words": index.total_length,
+            "terms": len(index.index),
+            "postings": n_postings,
+            "seconds": stats["seconds"],
+            "docs_per_s": stats["docs"] / stats["seconds"],
+            "mb_per_s": stats["bytes"] / stats["seconds"] / 1e6,
+        },
+    }
+
+    if not args.no_memory:
+        # Separate build: tracemalloc slows allocation down and would skew the timing
+        del index
+        tracemalloc.start()
+        index, _ = build(docs, args)
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        result["memory"] = {
+            "index_mb": current / 1e6,
+            "peak_mb": peak / 1e6,
+            "bytes_per_posting": current / max(n_postings, 1),
+        }
+
+    query_sets = {"1_word": 1, "2_words": 2, f"{args.many}_words": args.many}
+    result["queries"] = {}
+    for name, n_words in query_sets.items():
+        queries = make_queries(args.queries, n_words, vocab, cum_weights, rng)
+        result["queries"][name] = time_queries(
+            lambda q: index.search(q, k=args.k, scoring=args.scoring), queries)
+    if args.positional:
+        phrases = make_queries(args.queries, 2, vocab, cum_weights, rng)
+        result["queries"]["phrase"] = time_queries(
+            lambda q: index.phrase_search(q, k=args.k), phrases)
+
+    # The history stack is on every query path of the app; time it quietly
+    stack = Stack(verbose=False)
+    start = time.perf_counter()
+    for i in range(args.queries):
+        stack.push(i)
+        stack.pop()
+    result["stack_ns_per_op"] = (time.perf_counter() - start) / (2 * args.queries) * 1e9
+    return result
+
+
+def compare(result, baseline):
+    """Print new/old ratios for the timing metrics (> 1 means slower)."""
+    print("\nChange vs baseline (new / old):", file=sys.stderr)
+    old_build, new_build = baseline.get("build", {}), result["build"]
+    if old_build.get("seconds"):
+        print(f"  build time     {new_build['seconds'] / old_build['seconds']:.2f}x", file=sys.stderr)
+    if "memory" in result and baseline.get("memory", {}).get("index_mb"):
+        ratio = result["memory"]["index_mb"] / baseline["memory"]["index_mb"]
+        print(f"  index memory   {ratio:.2f}x", file=sys.stderr)
+    for name, stats in result["queries"].items():
+        old = baseline.get("queries", {}).get(name)
+        if old:
+            print(f"  {name:<14} p50 {stats['p50_us'] / old['p50_us']:.2f}x   "
+                  f"p99 {stats['p99_us'] / old['p99_us']:.2f}x", file=sys.stderr)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the search index.")
+    parser.add_argument("--docs", type=int, default=10000, help="documents in the corpus")
+    parser.add_argument("--vocab", type=int, default=50000, help="distinct words")
+    parser.add_argument("--zipf", type=float, default=1.1, help="Zipf exponent of word frequencies")
+    parser.add_argument("--doc-length", type=int, default=200, help="average words per document")
+    parser.add_argument("--queries", type=int, default=1000, help="queries per query set")
+    parser.add_argument("--many", type=int, default=5, help="words in the many-word queries")
+    parser.add_argument("--k", type=int, default=10, help="top-k (0 = all results)")
+    parser.add_argument("--scoring", choices=("tf", "bm25"), default="bm25")
+    parser.add_argument("--positional", action="store_true", help="also index positions and time phrase queries")
+    parser.add_argument("--workers", type=int, default=1, help="processes used to build the index")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--no-memory", action="store_true", help="skip the memory measurement build")
+    parser.add_argument("--label", default="", help="free-form name stored with the results")
+    parser.add_argument("--out", help="write the JSON results to this file")
+    parser.add_argument("--compare", help="baseline JSON file to compare against")
+    args = parser.parse_args(argv)
+    args.k = args.k or None
+
+    result = run(args)
+    text = json.dumps(result, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    print(text)
+    if args.compare and os.path.exists(args.compare):
+        with open(args.compare, "r", encoding="utf-8") as f:
+            compare(result, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
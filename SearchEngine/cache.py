@@ -0,0 +1,72 @@
+# cache.py
+import time
+from collections import OrderedDict
+
+
+class QueryCache:
+    """LRU cache of search results, keyed on cleaned query words.
+
+    Entries expire after ttl seconds and are dropped as soon as the index
+    changes the postings of one of their words (see invalidate).
+    """
+
+    def __init__(self, maxsize=128, ttl=300):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        # key -> (expiry time, results, words), least recently used first
+        self._entries = OrderedDict()
+        # word -> keys of the entries whose query contains it
+        self._by_word = {}
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        """Cached results for key, or None."""
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] < time.monotonic():
+            self._remove(key)
+            entry = None
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, key, words, results):
+        """Store results for key; words are the query words it depends on."""
+        if key in self._entries:
+            self._remove(key)
+        words = frozenset(words)
+        self._entries[key] = (time.monotonic() + self.ttl, results, words)
+        for word in words:
+            self._by_word.setdefault(word, set()).add(key)
+        while len(self._entries) > self.maxsize:
+            self._remove(next(iter(self._entries)))
+
+    def _remove(self, key):
+        _, _, words = self._entries.pop(key)
+        for word in words:
+            keys = self._by_word.get(word)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_word[word]
+
+    def invalidate(self, words=None):
+        """Drop entries whose query uses any of words (all entries if words is None)."""
+        if words is None:
+            self._entries.clear()
+            self._by_word.clear()
+            return
+        for word in words:
+            for key in list(self._by_word.get(word, ())):
+                self._remove(key)
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {"size": len(self._entries), "hits": self.hits, "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0}
@@ -0,0 +1,117 @@
+# gpt.py
+import asyncio
+import hashlib
+import json
+import os
+import threading
+
+
+def answer_key(words):
+    """Content address of a query: hash of its cleaned words."""
+    return hashlib.sha256(" ".join(words).encode("utf-8")).hexdigest()
+
+
+def openai_ask(api_key=None, model="gpt-3.5-turbo", temperature=0.7, max_tokens=200):
+    """Build an async ask(query) -> answer function backed by the OpenAI API."""
+    from openai import AsyncOpenAI
+
+    api_key = api_key or os.getenv("OPENAI_API_KEY")
+    if not api_key:
+        raise ValueError("OPENAI_API_KEY not found in environment variables!")
+    client = AsyncOpenAI(api_key=api_key)
+
+    async def ask(query):
+        response = await client.chat.completions.create(
+            model=model,
+            messages=[{"role": "user", "content": query}],
+            temperature=temperature,
+            max_tokens=max_tokens
+        )
+        return response.choices[0].message.content
+
+    return ask
+
+
+class AnswerCache:
+    """Saved GPT answers: answer key -> name of the gpt doc holding the answer.
+
+    Stored as JSON next to the answers so it survives restarts.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.answers = {}
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                self.answers = json.load(f)
+        except (FileNotFoundError, ValueError):
+            pass
+
+    def get(self, key):
+        """Doc name of the saved answer, if its file still exists."""
+        doc = self.answers.get(key)
+        if doc is None or not os.path.exists(os.path.join(os.path.dirname(self.path), f"{doc}.txt")):
+            return None
+        return doc
+
+    def put(self, key, doc):
+        self.answers[key] = doc
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.answers, f, indent=1)
+        os.replace(tmp_path, self.path)
+
+
+class GPTFallback:
+    """Runs GPT requests on a background asyncio loop.
+
+    At most max_concurrency requests run at once, each one is cancelled after
+    timeout seconds, and identical requests in flight share one call. ask is
+    any function query -> answer, async or not, so tests can pass a stub.
+    """
+
+    def __init__(self, ask, max_concurrency=2, timeout=30):
+        self.ask = ask
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self._semaphore = None
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+        self._thread.start()
+
+    async def _fetch(self, query):
+        # Created here so it belongs to the background loop
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        async with self._semaphore:
+            if asyncio.iscoroutinefunction(self.ask):
+                call = self.ask(query)
+            else:
+                call = self._loop.run_in_executor(None, self.ask, query)
+            return await asyncio.wait_for(call, self.timeout)
+
+    def submit(self, query, key):
+        """Start (or join) the request for key. Returns a concurrent.futures.Future."""
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is None:
+                future = asyncio.run_coroutine_threadsafe(self._fetch(query), self._loop)
+                self._inflight[key] = future
+                future.add_done_callback(lambda _, key=key: self._finished(key))
+            return future
+
+    def _finished(self, key):
+        with self._lock:
+            self._inflight.pop(key, None)
+
+    def close(self):
+        """Stop the background loop; requests still running are cancelled."""
+        with self._lock:
+            futures = list(self._inflight.values())
+        for future in futures:
+            future.cancel()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
@@ -1,54 +1,789 @@
 # index.py
+import heapq
+import math
+import os
 import string
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from fnmatch import fnmatchcase
+from functools import partial
+
+from postings import (PostingList, decode_positions, encode_positions, encode_varint,
+                      gallop, intersect, pack, split_blobs, union)
+from storage import MappedIndex, MappedPositions, write_index, write_positions
+from terms import TermDictionary
+
+# BM25 parameters (usual defaults)
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Bulk indexing: documents per worker task, and bytes read per file chunk
+BATCH_SIZE = 256
+CHUNK_SIZE = 1 << 20
+
+# Translation table that strips punctuation, built once
+PUNCTUATION = str.maketrans('', '', string.punctuation)
+# Queries keep '*' for wildcards ("mach*")
+QUERY_PUNCTUATION = str.maketrans('', '', string.punctuation.replace('*', ''))
+
+# Wildcards match at most this many words (the most frequent ones)
+MAX_EXPANSIONS = 64
+
+# Compact in the background once this share of the live docs is tombstoned
+COMPACT_RATIO = 0.2
+
+# After a bulk build, lists shorter than PACK_MAX_LEN are moved into shared
+# arrays of up to PACK_SEGMENT postings (so the copy never doubles the index)
+PACK_MAX_LEN = 4096
+PACK_SEGMENT = 1 << 18
+
+
+def tokenize(text):
+    """Lowercase, strip punctuation and split into words."""
+    return text.lower().translate(PUNCTUATION).split()
+
+
+def read_words(path, chunk_size=CHUNK_SIZE):
+    """Yield the words of a text file chunk by chunk, without loading it whole."""
+    tail = ""
+    with open(path, "r", encoding="utf-8") as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            clean = tail + chunk.lower().translate(PUNCTUATION)
+            words = clean.split()
+            # A word touching the end of the chunk may continue in the next one
+            tail = words.pop() if words and not clean[-1].isspace() else ""
+            yield words
+    if tail:
+        yield [tail]
+
+
+def _word_positions(words, offset=0):
+    """word -> list of its positions, numbering words from offset."""
+    positions = {}
+    for pos, word in enumerate(words, offset):
+        found = positions.get(word)
+        if found is None:
+            positions[word] = [pos]
+        else:
+            found.append(pos)
+    return positions
+
+
+def _index_batch(batch, from_files, positional=False):
+    """Worker task: build a partial index for a batch of documents.
+
+    batch holds (doc, text) pairs, or (doc, path) pairs when from_files is set.
+    Returns the doc table of the batch, as (doc, length, bytes, info) tuples,
+    and {word: (local ids, freqs, positions)} where local ids are positions in
+    the batch and positions is a list of encoded position blobs (or None).
+    """
+    docs = []
+    partial_index = {}
+    for local_id, (doc, source) in enumerate(batch):
+        if from_files:
+            st = os.stat(source)
+            info = (st.st_mtime_ns, st.st_size)
+            nbytes = st.st_size
+            chunks = read_words(source)
+        else:
+            info = None
+            nbytes = len(source.encode("utf-8"))
+            chunks = [tokenize(source)]
+        counts = Counter()
+        positions = {}
+        length = 0
+        for words in chunks:
+            if positional:
+                for word, found in _word_positions(words, length).items():
+                    positions.setdefault(word, []).extend(found)
+            else:
+                counts.update(words)
+            length += len(words)
+        if positional:
+            counts = {word: len(found) for word, found in positions.items()}
+        docs.append((doc, length, nbytes, info))
+        for word, count in counts.items():
+            entry = partial_index.get(word)
+            if entry is None:
+                entry = partial_index[word] = (array("I"), array("I"), [] if positional else None)
+            entry[0].append(local_id)
+            entry[1].append(count)
+            if positional:
+                entry[2].append(encode_positions(positions[word]))
+    return docs, partial_index
+
+
+def _phrase_starts(per_word, slop):
+    """Positions of the first phrase word that start a match.
+
+    A match continues from position p with the next word at p+1 .. p+1+slop.
+    Working back from the last word, each word keeps only the positions that
+    can still be completed; one forward pointer per list makes it a linear
+    merge instead of trying every combination of positions.
+    """
+    reachable = per_word[-1]
+    for positions in reversed(per_word[:-1]):
+        kept = []
+        j = 0
+        for pos in positions:
+            # First later-word position after pos (pos only grows)
+            while j < len(reachable) and reachable[j] <= pos:
+                j += 1
+            if j < len(reachable) and reachable[j] <= pos + 1 + slop:
+                kept.append(pos)
+        reachable = kept
+        if not reachable:
+            break
+    return reachable
+
 
 class InvertedIndex:
-    """A simple inverted index: word -> document -> frequency."""
+    """A simple inverted index: word -> document -> frequency.
+
+    With positional=True it also records where each word occurs, which
+    phrase_search needs; plain searches never read the positions.
+    """
 
-    def __init__(self):
-        # Dictionary to store index
-        # Example: { "word": {"doc1": 2, "doc2": 1} }
+    def __init__(self, positional=False):
+        # Dictionary to store index: word -> PostingList of (doc id, frequency)
+        # Example: { "word": ids=[0, 3], freqs=[2, 1] }
         self.index = {}
+        # Doc table: id -> name and name -> id
+        self.doc_names = []
+        self.doc_ids = {}
+        # (mtime_ns, size) of the source file per doc id, or None
+        self.doc_info = []
+        # Number of words per doc id (BM25 statistics), and their sum
+        self.doc_lengths = array("I")
+        self.total_length = 0
+        # Tombstones: ids of removed documents, skipped at query time until
+        # compaction (in memory) or save (on disk) rewrites their postings
+        self._dropped = set()
+        self._uncompacted = set()
+        self.auto_compact = True
+        self._compactor = None
+        # Guards posting lists that compaction swaps while add_doc writes
+        self._lock = threading.Lock()
+        # Postings loaded from disk are wrapped into self.index on first use
+        self._mapped = None
+        # Shortest doc, used for BM25 upper bounds
+        self._min_length = None
+        # Callbacks told which words changed (None = any word), e.g. result caches
+        self._listeners = []
+        # Positional data: word -> {doc id: encoded positions}, filled lazily
+        # from the .pos sidecar of a saved index
+        self.positional = positional
+        self._positions = {}
+        self._positions_path = None
+        self._mapped_positions = None
+        # Sorted term dictionary for wildcards and typo correction, built on first use
+        self._term_dict = None
 
-    def add_doc(self, doc, text):
-        """Add a document to the index."""
-        # Convert text to lowercase and remove punctuation
-        clean_text = text.lower().translate(str.maketrans('', '', string.punctuation))
+    def add_listener(self, callback):
+        """Call callback(words) whenever postings change; words is None if unknown."""
+        self._listeners.append(callback)
 
-        # Split text into words
-        words = clean_text.split()
+    def _notify(self, words):
+        for callback in self._listeners:
+            callback(words)
 
-        for word in words:
-            if word not in self.index:
-                self.index[word] = {}
-            # Count how many times a word appears in a document
-            self.index[word][doc] = self.index[word].get(doc, 0) + 1
+    @property
+    def doc_count(self):
+        """Number of live documents."""
+        return len(self.doc_ids)
+
+    def _doc_id(self, doc):
+        """Id of a document, registering it if new."""
+        doc_id = self.doc_ids.get(doc)
+        if doc_id is None:
+            doc_id = self.doc_ids[doc] = len(self.doc_names)
+            self.doc_names.append(doc)
+            self.doc_info.append(None)
+            self.doc_lengths.append(0)
+        return doc_id
+
+    def _add_length(self, doc_id, n):
+        length = self.doc_lengths[doc_id] = self.doc_lengths[doc_id] + n
+        self.total_length += n
+        if length and (self._min_length is None or length < self._min_length):
+            self._min_length = length
+
+    def add_doc(self, doc, text, info=None):
+        """Add a document to the index.
+
+        info is the (mtime_ns, size) of the file the text came from, which
+        refresh() compares to tell whether the file changed since.
+        """
+        # Lowercase, remove punctuation and split text into words
+        words = tokenize(text)
+
+        doc_id = self._doc_id(doc)
+        if info is not None:
+            self.doc_info[doc_id] = info
+        offset = self.doc_lengths[doc_id]
+        self._add_length(doc_id, len(words))
+
+        # Count how many times a word appears in a document
+        counts = Counter(words)
+        with self._lock:
+            for word, count in counts.items():
+                postings = self._postings(word)
+                if postings is None:
+                    postings = self._new_postings(word)
+                postings.add(doc_id, count)
+            if self.positional:
+                for word, found in _word_positions(words).items():
+                    self._add_positions(word, doc_id, encode_positions(found), offset)
+        self._notify(counts.keys())
+
+    def _postings(self, word):
+        """Return the PostingList of a word, reading it from disk if needed."""
+        postings = self.index.get(word)
+        if postings is not None or self._mapped is None:
+            return postings
+        found = self._mapped.postings(word)
+        if found is None:
+            return None
+        postings = self.index[word] = PostingList(*found)
+        return postings
+
+    def _new_postings(self, word):
+        postings = self.index[word] = PostingList()
+        if self._term_dict is not None:
+            self._term_dict.add(word)
+        return postings
+
+    def _doc_positions(self, word):
+        """{doc id: encoded positions} of a word, read from the sidecar on first use."""
+        found = self._positions.get(word)
+        if found is not None:
+            return found
+        found = self._positions[word] = {}
+        if self._mapped is None or self._positions_path is None:
+            return found
+        term_no = self._mapped.find(word)
+        if term_no < 0:
+            return found
+        if self._mapped_positions is None:
+            self._mapped_positions = MappedPositions(self._positions_path)
+        ids = self._mapped.postings(word)[0]
+        found.update(zip(ids, split_blobs(self._mapped_positions.blob(term_no))))
+        return found
+
+    def _add_positions(self, word, doc_id, blob, offset):
+        """Record positions of word in doc_id; offset shifts them when a doc is extended."""
+        doc_positions = self._doc_positions(word)
+        old = doc_positions.get(doc_id)
+        if old is not None:
+            blob = encode_positions(decode_positions(old) +
+                                    [p + offset for p in decode_positions(blob)])
+        doc_positions[doc_id] = blob
 
     def _clean_query(self, query):
         """Helper function to clean search queries."""
-        query = query.lower().translate(str.maketrans('', '', string.punctuation))
-        return query.split()
+        words = query.lower().translate(QUERY_PUNCTUATION).split()
+        return [w for w in words if w.strip("*")]
+
+    # ------------------ TERM LOOKUP -------------------
+
+    def term_dictionary(self):
+        """The sorted dictionary of all indexed words."""
+        if self._term_dict is None:
+            self._term_dict = TermDictionary(self._terms())
+        return self._term_dict
+
+    def expand(self, pattern):
+        """Indexed words matching a wildcard pattern like "mach*" or "col*r".
+
+        The part before the first '*' is looked up as a prefix; patterns that
+        start with '*' are not expanded.
+        """
+        prefix = pattern.split("*", 1)[0]
+        if not prefix:
+            return []
+        words = self.term_dictionary().complete(prefix)
+        if pattern != prefix + "*":
+            words = [w for w in words if fnmatchcase(w, pattern)]
+        if len(words) > MAX_EXPANSIONS:
+            words = sorted(words, key=lambda w: len(self._postings(w)), reverse=True)[:MAX_EXPANSIONS]
+        return words
+
+    def correct(self, word, max_edits=None):
+        """Closest indexed word to a misspelled one, or None.
+
+        max_edits defaults to 1 for words of 3-5 letters and 2 for longer
+        ones; ties go to the word found in more documents.
+        """
+        if max_edits is None:
+            max_edits = 0 if len(word) < 3 else 1 if len(word) <= 5 else 2
+        if max_edits == 0:
+            return None
+        found = self.term_dictionary().fuzzy(word, max_edits)
+        if not found:
+            return None
+        return min(found, key=lambda m: (m[0], -len(self._postings(m[1]) or ()), m[1]))[1]
+
+    def suggest_query(self, query):
+        """The query with unknown words replaced by their corrections, or None."""
+        words = self._clean_query(query)
+        changed = False
+        for i, word in enumerate(words):
+            if "*" in word or self._postings(word):
+                continue
+            fixed = self.correct(word)
+            if fixed is None:
+                return None
+            words[i] = fixed
+            changed = True
+        return " ".join(words) if changed else None
+
+    def _query_postings(self, word):
+        """Postings of a query word; wildcards get the union of their expansions."""
+        if "*" not in word:
+            return self._postings(word)
+        lists = [self._postings(w) for w in self.expand(word)]
+        return union(lists) if lists else None
+
+    def _df(self, postings, dropped):
+        """Number of live docs in a posting list.
+
+        Tombstoned ids stay in the lists until compact() or save(), so they
+        are subtracted here; otherwise df could exceed doc_count.
+        """
+        ids = postings.ids
+        if not dropped:
+            return len(ids)
+        if len(dropped) < len(ids):
+            dead = 0
+            for doc_id in dropped:
+                i = bisect_left(ids, doc_id)
+                dead += i < len(ids) and ids[i] == doc_id
+        else:
+            dead = sum(1 for doc_id in ids if doc_id in dropped)
+        return len(ids) - dead
 
-    def search(self, query):
-        """Search for documents that contain all words in the query."""
+    def _idf(self, df):
+        n = self.doc_count
+        # Never negative, so the MaxScore bounds below stay upper bounds
+        return max(0.0, math.log(1 + (n - df + 0.5) / (df + 0.5)))
+
+    def _bm25(self, idf, tf, length, avg_length):
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * length / avg_length)
+        return idf * tf * (BM25_K1 + 1) / (tf + norm)
+
+    def search(self, query, k=None, scoring="tf"):
+        """Search for documents that contain all words in the query.
+
+        scoring="tf" ranks by the sum of word frequencies, scoring="bm25" by
+        Okapi BM25. A word with '*' matches any indexed word fitting the
+        pattern. With k set only the k best results are kept (bounded heap),
+        and documents that cannot beat the current k-th score are skipped
+        before all of their postings are looked up (MaxScore-style pruning).
+        """
+        if scoring not in ("tf", "bm25"):
+            raise ValueError(f"Unknown scoring mode: {scoring}")
         q_words = self._clean_query(query)
         if not q_words:
             return []
+        # Read before the lists: compact() prunes tombstones only after it
+        # has swapped in the lists without them
+        dropped = self._dropped
 
-        # Start with documents containing the first word
-        if q_words[0] not in self.index:
-            return []
-        results = set(self.index[q_words[0]].keys())
+        # (postings, weight) per distinct word, rarest first: the rarest word
+        # drives the candidates and the others are only probed.
+        terms = []
+        for word, weight in Counter(q_words).items():
+            postings = self._query_postings(word)
+            if not postings:
+                return []
+            terms.append((postings, weight))
+        terms.sort(key=lambda t: len(t[0]))
+
+        lengths = self.doc_lengths
+        avg_length = self.total_length / self.doc_count if self.total_length else 1
+        idfs = [self._idf(self._df(postings, dropped)) for postings, _ in terms]
+
+        def term_score(i, doc_id, tf):
+            if scoring == "tf":
+                return terms[i][1] * tf
+            return terms[i][1] * self._bm25(idfs[i], tf, lengths[doc_id], avg_length)
+
+        # Best possible contribution of each word, and of all words after it
+        bounds = []
+        for i, (postings, weight) in enumerate(terms):
+            if scoring == "tf":
+                bounds.append(weight * postings.max_tf)
+            else:
+                bounds.append(weight * self._bm25(idfs[i], postings.max_tf,
+                                                  self._min_length or 0, avg_length))
+        remaining = [0] * (len(terms) + 1)
+        for i in range(len(terms) - 1, -1, -1):
+            remaining[i] = remaining[i + 1] + bounds[i]
+
+        cursors = [0] * len(terms)
+        heap = []  # min-heap of (score, doc id) holding the best k so far
+        ranked = []
+        term_ids = [postings.ids for postings, _ in terms]
+        term_freqs = [postings.freqs for postings, _ in terms]
+        for doc_id, tf in zip(term_ids[0], term_freqs[0]):
+            if doc_id in dropped:
+                continue
+            score = term_score(0, doc_id, tf)
+            for i in range(1, len(terms)):
+                if k and len(heap) == k and score + remaining[i] <= heap[0][0]:
+                    break  # cannot enter the top k
+                # Doc ids only grow, so each list is walked forward by galloping
+                ids = term_ids[i]
+                pos = cursors[i] = gallop(ids, doc_id, cursors[i])
+                if pos == len(ids) or ids[pos] != doc_id:
+                    break  # doc misses a query word
+                score += term_score(i, doc_id, term_freqs[i][pos])
+            else:
+                if not k:
+                    ranked.append((score, doc_id))
+                elif len(heap) < k:
+                    heapq.heappush(heap, (score, doc_id))
+                elif score > heap[0][0]:
+                    heapq.heapreplace(heap, (score, doc_id))
+
+        if k:
+            ranked = heap
+        ranked.sort(key=lambda x: x[0], reverse=True)
+        return [{"doc": self.doc_names[doc_id], "score": score} for score, doc_id in ranked]
 
-        # Keep only docs that contain all other words
-        for word in q_words[1:]:
-            if word not in self.index:
+    def phrase_search(self, phrase, slop=0, k=None):
+        """Documents containing the words of phrase in order.
+
+        slop is how many other words may sit between two consecutive phrase
+        words (0 = exact phrase). Candidates come from the usual doc-level
+        intersection; positions are only decoded for them. Score is the
+        number of occurrences.
+        """
+        if not self.positional:
+            raise ValueError("phrase_search needs an index built with positional=True")
+        q_words = tokenize(phrase)
+        if not q_words:
+            return []
+        dropped = self._dropped   # before the lists, as in search()
+        lists = []
+        for word in q_words:
+            postings = self._postings(word)
+            if not postings:
                 return []
-            results = results & set(self.index[word].keys())
+            lists.append(postings)
+        candidates = intersect(lists, skip=dropped)
 
-        # Rank results by score (sum of word frequencies)
+        doc_positions = [self._doc_positions(word) for word in q_words]
         ranked = []
-        for doc in results:
-            score = sum(self.index[word].get(doc, 0) for word in q_words)
-            ranked.append({"doc": doc, "score": score})
+        for doc_id in candidates:
+            per_word = [decode_positions(positions[doc_id]) for positions in doc_positions]
+            matches = len(_phrase_starts(per_word, slop))
+            if matches:
+                ranked.append((matches, doc_id))
+        ranked = heapq.nlargest(k, ranked) if k else sorted(ranked, reverse=True)
+        return [{"doc": self.doc_names[doc_id], "score": score} for score, doc_id in ranked]
+
+    # ------------------ BULK INDEXING -------------------
+
+    def _merge_batch(self, docs, partial_index):
+        """Merge a partial index from _index_batch, giving its docs global ids."""
+        global_ids = []
+        offsets = []
+        for doc, length, _, info in docs:
+            doc_id = self._doc_id(doc)
+            offsets.append(self.doc_lengths[doc_id])
+            self._add_length(doc_id, length)
+            if info is not None:
+                self.doc_info[doc_id] = info
+            global_ids.append(doc_id)
+        # Normally all docs are new and get increasing ids; re-added names do not
+        ordered = all(a < b for a, b in zip(global_ids, global_ids[1:]))
+        with self._lock:
+            for word, (local_ids, freqs, blobs) in partial_index.items():
+                postings = self._postings(word)
+                if postings is None:
+                    postings = self._new_postings(word)
+                ids = array("I", (global_ids[i] for i in local_ids))
+                if ordered:
+                    postings.extend(ids, freqs)
+                else:
+                    for doc_id, count in zip(ids, freqs):
+                        postings.add(doc_id, count)
+                if self.positional:
+                    for local_id, blob in zip(local_ids, blobs):
+                        self._add_positions(word, global_ids[local_id], blob, offsets[local_id])
+        self._notify(partial_index.keys())
+
+    def _bulk_add(self, items, from_files, workers):
+        """Index (doc, text|path) items, tokenizing batches in a process pool."""
+        start = time.perf_counter()
+        batches = [items[i:i + BATCH_SIZE] for i in range(0, len(items), BATCH_SIZE)]
+        task = partial(_index_batch, from_files=from_files, positional=self.positional)
+        if workers is None:
+            workers = os.cpu_count() or 1
+        workers = min(workers, len(batches))
+        n_docs = n_bytes = 0
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                # map() keeps batch order, so new doc ids stay increasing
+                results = pool.map(task, batches)
+                for docs, partial_index in results:
+                    self._merge_batch(docs, partial_index)
+                    n_docs += len(docs)
+                    n_bytes += sum(d[2] for d in docs)
+        else:
+            for batch in batches:
+                docs, partial_index = task(batch)
+                self._merge_batch(docs, partial_index)
+                n_docs += len(docs)
+                n_bytes += sum(d[2] for d in docs)
+        self._pack()
+        return {"docs": n_docs, "bytes": n_bytes, "seconds": time.perf_counter() - start}
+
+    def _pack(self):
+        """Move the short lists written to since the last pack into shared arrays."""
+        with self._lock:
+            group = []
+            size = 0
+            # Words only: holding the old lists would keep them all alive
+            for word in list(self.index):
+                postings = self.index[word]
+                if len(postings) >= PACK_MAX_LEN or not postings.owns_arrays:
+                    continue
+                group.append(word)
+                size += len(postings)
+                if size >= PACK_SEGMENT:
+                    self._pack_group(group)
+                    group = []
+                    size = 0
+            if group:
+                self._pack_group(group)
+
+    def _pack_group(self, words):
+        # Fresh lists swapped in, like compact(): searches may hold the old ones
+        for word, postings in zip(words, pack([self.index[word] for word in words])):
+            self.index[word] = postings
+
+    def add_docs(self, docs, workers=1):
+        """Add many (doc, text) pairs at once. Returns {"docs", "bytes", "seconds"}."""
+        return self._bulk_add(list(docs), False, workers)
+
+    def add_files(self, files, workers=None):
+        """Add many (doc, path) text files, streamed from disk by the workers."""
+        return self._bulk_add(list(files), True, workers)
+
+    def build_from_directory(self, path, workers=None):
+        """Index every .txt file in a folder using a pool of worker processes."""
+        files = [(os.path.splitext(f)[0], os.path.join(path, f))
+                 for f in sorted(os.listdir(path)) if f.endswith(".txt")]
+        return self.add_files(files, workers)
+
+    # ------------------ PERSISTENCE -------------------
+
+    def _terms(self):
+        """All indexed words, in memory or still on disk."""
+        if self._mapped is None:
+            return set(self.index)
+        return set(self.index).union(self._mapped.terms())
+
+    def save(self, path):
+        """Write the index to disk and re-open it memory-mapped.
+
+        Removed documents are left out and the remaining ids are renumbered densely.
+        """
+        if self._compactor is not None:
+            self._compactor.join()
+        live = [i for i in range(len(self.doc_names)) if i not in self._dropped]
+        terms, position_blobs = self._live_postings(live)
+        # Write next to the live file: the current mapping may still be read
+        # from (lazy postings) until the new file is complete
+        write_index(path + ".tmp", [self.doc_names[i] for i in live],
+                    [self.doc_info[i] for i in live], [self.doc_lengths[i] for i in live], terms)
+        positions_path = path + ".pos"
+        if self.positional:
+            write_positions(positions_path + ".tmp", position_blobs)
+
+        # Everything is on disk now: drop the in-memory copies and unmap the
+        # old files, since Windows cannot replace a file that is still mapped
+        self.close()
+        os.replace(path + ".tmp", path)
+        if self.positional:
+            os.replace(positions_path + ".tmp", positions_path)
+        elif os.path.exists(positions_path):
+            os.remove(positions_path)
+        self._load_mapped(MappedIndex(path))
+
+    def _live_postings(self, live):
+        """(terms, position blobs) for save(), with live doc ids renumbered densely.
+
+        Everything returned is a copy, so nothing keeps the old mapping in use.
+        """
+        new_ids = {old: new for new, old in enumerate(live)}
+        terms = []
+        position_blobs = []
+        for word in sorted(self._terms()):
+            postings = self._postings(word)
+            doc_positions = self._doc_positions(word) if self.positional else None
+            ids = array("I")
+            freqs = array("I")
+            blob = bytearray()
+            for doc_id, freq in zip(postings.ids, postings.freqs):
+                if doc_id in new_ids:
+                    ids.append(new_ids[doc_id])
+                    freqs.append(freq)
+                    if self.positional:
+                        encode_varint(len(doc_positions[doc_id]), blob)
+                        blob += doc_positions[doc_id]
+            if ids:
+                terms.append((word, ids, freqs))
+                position_blobs.append(bytes(blob))
+        return terms, position_blobs
+
+    def close(self):
+        """Unmap the saved index files (save() maps the new ones again)."""
+        self.index = {}
+        self._positions = {}
+        if self._mapped is not None:
+            self._mapped.close()
+            self._mapped = None
+        if self._mapped_positions is not None:
+            self._mapped_positions.close()
+            self._mapped_positions = None
+
+    def _load_mapped(self, mapped):
+        self._mapped = mapped
+        if self._mapped_positions is not None:
+            self._mapped_positions.close()
+            self._mapped_positions = None
+        self._positions = {}
+        self._term_dict = None
+        positions_path = mapped.path + ".pos"
+        self.positional = os.path.exists(positions_path)
+        self._positions_path = positions_path if self.positional else None
+        self.doc_names = list(mapped.doc_names)
+        self.doc_ids = {doc: i for i, doc in enumerate(self.doc_names)}
+        self.doc_info = list(mapped.doc_info)
+        self.doc_lengths = array("I", mapped.doc_lengths)
+        self.total_length = sum(self.doc_lengths)
+        self._dropped = set()
+        self._uncompacted = set()
+        self._min_length = min((n for n in self.doc_lengths if n), default=None)
+
+    @classmethod
+    def load(cls, path):
+        """Open an index saved with save(). Postings are read lazily from the mapping,
+        positions (if it was saved positional) only by the first phrase query."""
+        idx = cls()
+        idx._load_mapped(MappedIndex(path))
+        return idx
+
+    # ------------------ UPDATES -------------------
+
+    def remove_doc(self, doc):
+        """Remove a document. Returns False if it was not indexed.
+
+        The doc id is only tombstoned: queries skip it right away, and its
+        postings are rewritten later by compact() or save().
+        """
+        doc_id = self.doc_ids.pop(doc, None)
+        if doc_id is None:
+            return False
+        with self._lock:
+            self._dropped.add(doc_id)
+            self._uncompacted.add(doc_id)
+        self.total_length -= self.doc_lengths[doc_id]
+        # The doc's words are not known without re-reading it
+        self._notify(None)
+        if self.auto_compact and len(self._uncompacted) > COMPACT_RATIO * max(self.doc_count, 1):
+            self.compact_in_background()
+        return True
+
+    def update_doc(self, doc, text):
+        """Replace the text of a document (re-indexed under a new id)."""
+        self.remove_doc(doc)
+        self.add_doc(doc, text)
+
+    def compact(self):
+        """Rewrite in-memory posting lists without tombstoned docs.
+
+        New lists are built next to the old ones and swapped in one word at a
+        time, so searches keep running on the old lists meanwhile. Lists still
+        on disk are left alone; they are filtered at query time until save().
+        """
+        dropped = frozenset(self._dropped)
+        cleaned = frozenset(self._uncompacted)
+        left = set()   # tombstones still in a list that changed meanwhile
+        for word, postings in list(self.index.items()):
+            version = postings.version
+            keep = [i for i, doc_id in enumerate(postings.ids) if doc_id not in dropped]
+            if len(keep) == len(postings.ids):
+                continue
+            fresh = PostingList(array("I", (postings.ids[i] for i in keep)),
+                                array("I", (postings.freqs[i] for i in keep)))
+            with self._lock:
+                # Skip lists that add_doc changed meanwhile; the next run gets them
+                if self.index.get(word) is postings and postings.version == version:
+                    self.index[word] = fresh
+                else:
+                    left.update(dropped.intersection(postings.ids))
+        for word, doc_positions in list(self._positions.items()):
+            if any(doc_id in dropped for doc_id in doc_positions):
+                with self._lock:
+                    for doc_id in dropped.intersection(doc_positions):
+                        doc_positions.pop(doc_id, None)
+        # Ids from the saved file may still be in lists not read from disk
+        # yet; the others are gone now and need no more skipping. A new set,
+        # so searches that already read the old one keep their tombstones.
+        saved = len(self._mapped.doc_names) if self._mapped is not None else 0
+        with self._lock:
+            self._uncompacted -= cleaned - left
+            self._dropped = {doc_id for doc_id in self._dropped
+                             if doc_id < saved or doc_id in left or doc_id not in cleaned}
+
+    def compact_in_background(self):
+        """Run compact() on a worker thread unless one is already running."""
+        if self._compactor is not None and self._compactor.is_alive():
+            return self._compactor
+        self._compactor = threading.Thread(target=self.compact, daemon=True)
+        self._compactor.start()
+        return self._compactor
+
+    def refresh(self, folders, workers=None):
+        """Re-index only the .txt files whose mtime/size changed since they were indexed.
+
+        Returns a dict with added/updated/removed counts and the bulk
+        indexing stats ("docs", "bytes", "seconds") of the re-read files.
+        """
+        added = updated = 0
+        seen = set()
+        changed = []
+        for folder in folders:
+            for f in sorted(os.listdir(folder)):
+                if not f.endswith(".txt"):
+                    continue
+                doc = os.path.splitext(f)[0]
+                path = os.path.join(folder, f)
+                st = os.stat(path)
+                seen.add(doc)
+                if doc in self.doc_ids:
+                    if self.doc_info[self.doc_ids[doc]] == (st.st_mtime_ns, st.st_size):
+                        continue
+                    self.remove_doc(doc)
+                    updated += 1
+                else:
+                    added += 1
+                changed.append((doc, path))
 
-        return sorted(ranked, key=lambda x: x["score"], reverse=True)
+        removed = [doc for doc in self.doc_ids if doc not in seen]
+        for doc in removed:
+            self.remove_doc(doc)
+        stats = self.add_files(changed, workers)
+        stats.update(added=added, updated=updated, removed=len(removed))
+        return stats
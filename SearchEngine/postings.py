@@ -0,0 +1,238 @@
+# postings.py
+from array import array
+from bisect import bisect_left
+
+
+class PostingList:
+    """Postings of one word: sorted doc ids with a parallel array of frequencies.
+
+    Both arrays are 4-byte unsigned ints. A list can also be a slice of
+    arrays it shares with other lists: lists read from a saved index are
+    read-only memoryviews into the mapped file, and pack() moves the short
+    lists of a bulk build into shared arrays. Either is copied into arrays
+    of its own on first write.
+    """
+
+    __slots__ = ("_ids", "_freqs", "_start", "_end", "_max_tf", "version")
+
+    def __init__(self, ids=None, freqs=None, start=0, end=None):
+        # end=None: the list is all of ids/freqs, else their [start:end] slice
+        self._ids = array("I") if ids is None else ids
+        self._freqs = array("I") if freqs is None else freqs
+        self._start = start
+        self._end = end
+        self._max_tf = None
+        # Bumped by every write, so compaction can tell the list changed
+        self.version = 0
+
+    @property
+    def ids(self):
+        if self._end is None:
+            return self._ids
+        return self._ids[self._start:self._end]
+
+    @property
+    def freqs(self):
+        if self._end is None:
+            return self._freqs
+        return self._freqs[self._start:self._end]
+
+    @property
+    def owns_arrays(self):
+        """True unless the postings live in a mapping or in arrays shared by pack()."""
+        return self._end is None and isinstance(self._ids, array)
+
+    def __len__(self):
+        if self._end is None:
+            return len(self._ids)
+        return self._end - self._start
+
+    @property
+    def max_tf(self):
+        """Highest frequency in the list (an upper bound once docs are dropped)."""
+        if self._max_tf is None:
+            self._max_tf = max(self.freqs, default=0)
+        return self._max_tf
+
+    def _writable(self):
+        if not self.owns_arrays:
+            self._ids = array("I", self.ids)
+            self._freqs = array("I", self.freqs)
+            self._start, self._end = 0, None
+
+    def add(self, doc_id, count):
+        """Add count occurrences for doc_id, keeping ids sorted. Returns the new frequency."""
+        self._writable()
+        self.version += 1
+        ids = self._ids
+        freqs = self._freqs
+        if not ids or doc_id > ids[-1]:
+            # New docs get the highest id so this is the common case
+            ids.append(doc_id)
+            freqs.append(count)
+            freq = count
+        else:
+            i = bisect_left(ids, doc_id)
+            if i < len(ids) and ids[i] == doc_id:
+                freqs[i] += count
+            else:
+                ids.insert(i, doc_id)
+                freqs.insert(i, count)
+            freq = freqs[i]
+        if self._max_tf is not None and freq > self._max_tf:
+            self._max_tf = freq
+        return freq
+
+    def extend(self, doc_ids, freqs):
+        """Add a run of postings whose ids are strictly increasing."""
+        if not doc_ids:
+            return
+        if len(self) and doc_ids[0] <= self.ids[-1]:
+            for doc_id, count in zip(doc_ids, freqs):
+                self.add(doc_id, count)
+            return
+        # The run follows the list: append it in one go
+        self._writable()
+        self.version += 1
+        self._ids.extend(doc_ids)
+        self._freqs.extend(freqs)
+        if self._max_tf is not None:
+            self._max_tf = max(self._max_tf, max(freqs))
+
+
+def pack(lists):
+    """Copies of lists that share two arrays, each copy a slice of them.
+
+    Every array has a header and room to grow, which for the many rare
+    words of a corpus takes more memory than their few postings.
+    """
+    total = sum(len(postings) for postings in lists)
+    ids = array("I", [0]) * total
+    freqs = array("I", [0]) * total
+    spans = []
+    start = 0
+    for postings in lists:
+        end = start + len(postings)
+        ids[start:end] = postings.ids
+        freqs[start:end] = postings.freqs
+        spans.append((start, end))
+        start = end
+    ids = memoryview(ids).toreadonly()
+    freqs = memoryview(freqs).toreadonly()
+    packed = []
+    for postings, (start, end) in zip(lists, spans):
+        copy = PostingList(ids, freqs, start, end)
+        copy._max_tf = postings._max_tf
+        packed.append(copy)
+    return packed
+
+
+def gallop(ids, target, lo=0):
+    """Index of the first id >= target at or after lo.
+
+    Probes lo+1, lo+2, lo+4, ... before a binary search, so walking a long
+    list with increasing targets costs O(log gap) per step instead of O(gap).
+    """
+    n = len(ids)
+    if lo >= n or ids[lo] >= target:
+        return lo
+    step = 1
+    hi = lo + 1
+    while hi < n and ids[hi] < target:
+        lo = hi
+        step *= 2
+        hi = lo + step
+    return bisect_left(ids, target, lo + 1, min(hi + 1, n))
+
+
+def intersect(lists, skip=()):
+    """Doc ids present in every PostingList, by galloping merge from the shortest."""
+    if not lists:
+        return []
+    lists = [postings.ids for postings in sorted(lists, key=len)]
+    cursors = [0] * len(lists)
+    result = []
+    for doc_id in lists[0]:
+        if doc_id in skip:
+            continue
+        for i in range(1, len(lists)):
+            ids = lists[i]
+            pos = cursors[i] = gallop(ids, doc_id, cursors[i])
+            if pos == len(ids):
+                return result
+            if ids[pos] != doc_id:
+                break
+        else:
+            result.append(doc_id)
+    return result
+
+
+def union(lists):
+    """One PostingList holding every doc of lists, frequencies summed."""
+    totals = {}
+    for postings in lists:
+        for doc_id, freq in zip(postings.ids, postings.freqs):
+            totals[doc_id] = totals.get(doc_id, 0) + freq
+    ids = sorted(totals)
+    return PostingList(array("I", ids), array("I", (totals[doc_id] for doc_id in ids)))
+
+
+# ------------------ POSITIONS -------------------
+# Word positions are stored per posting as delta-encoded varints: small gaps
+# between occurrences take one byte each.
+
+def encode_varint(n, out):
+    while n >= 0x80:
+        out.append(n & 0x7F | 0x80)
+        n >>= 7
+    out.append(n)
+
+
+def encode_positions(positions):
+    """Compress a sorted list of word positions."""
+    out = bytearray()
+    prev = 0
+    for p in positions:
+        encode_varint(p - prev, out)
+        prev = p
+    return bytes(out)
+
+
+def decode_varints(data):
+    """All varints in data, in order."""
+    values = []
+    value = shift = 0
+    for b in data:
+        value |= (b & 0x7F) << shift
+        if b & 0x80:
+            shift += 7
+        else:
+            values.append(value)
+            value = shift = 0
+    return values
+
+
+def decode_positions(data):
+    positions = decode_varints(data)
+    for i in range(1, len(positions)):
+        positions[i] += positions[i - 1]
+    return positions
+
+
+def split_blobs(data):
+    """Split a run of (varint length, bytes) records, as written by save()."""
+    blobs = []
+    i = 0
+    n = len(data)
+    while i < n:
+        length = shift = 0
+        while True:
+            b = data[i]
+            i += 1
+            length |= (b & 0x7F) << shift
+            if not b & 0x80:
+                break
+            shift += 7
+        blobs.append(bytes(data[i:i + length]))
+        i += length
+    return blobs
@@ -1,34 +1,58 @@
 # search.py
 import os
+import re
+from concurrent.futures import wait
 from stack import Stack
 from index import InvertedIndex
-from openai import OpenAI
+from cache import QueryCache
+from gpt import AnswerCache, GPTFallback, answer_key, openai_ask
 from dotenv import load_dotenv
 
-# Load environment variables
+# Load environment variables (OPENAI_API_KEY)
 load_dotenv()
-api_key = os.getenv("OPENAI_API_KEY")
-if not api_key:
-    raise ValueError("OPENAI_API_KEY not found in environment variables!")
-
-# Initialize OpenAI client
-client = OpenAI(api_key=api_key)
 
 # Folders
 DOC_PATH = "./documents"       # local documents folder
 GPT_PATH = "./gpt_docs"        # folder to store GPT results
+INDEX_PATH = "./search.idx"    # saved index, refreshed incrementally on startup
 os.makedirs(GPT_PATH, exist_ok=True)
 
+# Ranking
+SCORING = "bm25"               # "bm25" or "tf" (sum of word frequencies)
+TOP_K = 10                     # number of results shown per query
+POSITIONAL = True              # keep word positions for "phrase" queries
+
+# "exact phrase", or "words near each other"~N with up to N words in between
+PHRASE_QUERY = re.compile(r'^"(.+)"(?:~(\d+))?$')
+
+# Print every history push/pop (turn off for timing runs)
+STACK_LOG = True
+
+# Result cache
+CACHE_SIZE = 256               # cached queries
+CACHE_TTL = 600                # seconds before a cached result is recomputed
+
+# GPT fallback
+GPT_CONCURRENCY = 2            # requests running at the same time
+GPT_TIMEOUT = 30               # seconds before a request is given up
+ANSWERS_FILE = "answers.json"  # query hash -> saved answer, kept in GPT_PATH
+
 class SearchSim:
     """Hybrid Search Engine: local + GPT fallback with proper undo/redo."""
 
-    def __init__(self, doc_path=DOC_PATH, gpt_path=GPT_PATH):
-        self.index = InvertedIndex()
-        self.history = Stack()
-        self.redo = Stack()
+    def __init__(self, doc_path=DOC_PATH, gpt_path=GPT_PATH, index_path=INDEX_PATH, ask=None):
+        self.index = InvertedIndex(positional=POSITIONAL)
+        self.index_path = index_path
+        self.history = Stack(verbose=STACK_LOG)
+        self.redo = Stack(verbose=STACK_LOG)
         self.doc_path = doc_path
         self.gpt_path = gpt_path
         self.results = []
+        self.cache = QueryCache(CACHE_SIZE, CACHE_TTL)
+        # ask(query) -> answer; defaults to the OpenAI API
+        self.gpt = GPTFallback(ask or openai_ask(), GPT_CONCURRENCY, GPT_TIMEOUT)
+        self.answers = AnswerCache(os.path.join(gpt_path, ANSWERS_FILE))
+        self.pending = {}  # answer key -> (query, future) of GPT requests in flight
         self.gpt_counter = self._init_gpt_counter()
         self._load_docs()
 
@@ -39,27 +63,49 @@ class SearchSim:
         return max(numbers, default=0) + 1
 
     def _load_docs(self):
-        """Load local text files into index."""
-        print("Building index from local documents...")
+        """Open the saved index and re-index only new or changed text files."""
+        print("Loading index...")
+        if os.path.exists(self.index_path):
+            try:
+                saved = InvertedIndex.load(self.index_path)
+                if saved.positional == POSITIONAL:
+                    self.index = saved
+                else:
+                    # Unmap it, or saving the rebuilt index over it fails on Windows
+                    saved.close()
+                    print("Saved index has different position settings, rebuilding.")
+            except (OSError, ValueError) as e:
+                print(f"Saved index unusable ({e}), rebuilding.")
         try:
-            files = [f for f in os.listdir(self.doc_path) if f.endswith(".txt")]
-            for f in files:
-                doc_name = os.path.splitext(f)[0]
-                with open(os.path.join(self.doc_path, f), "r", encoding="utf-8") as file:
-                    self.index.add_doc(doc_name, file.read())
-            print(f"Index built with {len(files)} documents.")
+            stats = self.index.refresh([self.doc_path, self.gpt_path])
         except FileNotFoundError:
             print("Documents folder not found! Make sure './documents' exists.")
             exit()
+        if stats["added"] or stats["updated"] or stats["removed"]:
+            self.index.save(self.index_path)
+        # Any later change to a word's postings evicts the queries using it
+        self.index.add_listener(self.cache.invalidate)
+        seconds = max(stats["seconds"], 1e-9)
+        print(f"Index ready with {self.index.doc_count} documents "
+              f"({stats['added']} added, {stats['updated']} updated, {stats['removed']} removed).")
+        if stats["docs"]:
+            print(f"Indexed {stats['docs']} files in {stats['seconds']:.2f}s: "
+                  f"{stats['docs'] / seconds:.0f} docs/s, "
+                  f"{stats['bytes'] / seconds / 1e6:.2f} MB/s.")
 
     def run(self):
         """Main loop for user input."""
         while True:
+            self._collect_answers()
             user_input = input("\nEnter search query, 'back', 'next', 'show', or 'quit': ").strip()
             if not user_input:
                 continue
             cmd = user_input.lower()
             if cmd == "quit":
+                # Keep answers that are still on their way
+                self._collect_answers(timeout=GPT_TIMEOUT)
+                self.gpt.close()
+                self.index.save(self.index_path)
                 print("Goodbye!")
                 break
             elif cmd == "back":
@@ -68,47 +114,94 @@ class SearchSim:
                 self._next()
             elif cmd == "show":
                 self.history.show()
+                c = self.cache.stats()
+                print(f"Result cache: {c['size']} queries, {c['hits']} hits, "
+                      f"{c['misses']} misses ({c['hit_rate']:.0%} hit rate)")
             else:
                 self._search(user_input)
 
+    def _lookup(self, query):
+        """Search the index, reusing cached results for the same cleaned query.
+
+        Entries are evicted when one of their words gets new postings; BM25
+        scores also drift slightly as unrelated docs change N and the average
+        length, which CACHE_TTL bounds.
+        """
+        phrase = PHRASE_QUERY.match(query.strip()) if POSITIONAL else None
+        if phrase:
+            words = self.index._clean_query(phrase.group(1))
+            slop = int(phrase.group(2) or 0)
+            key = ("phrase", tuple(words), slop, TOP_K)
+        else:
+            words = self.index._clean_query(query)
+            key = (tuple(sorted(words)), TOP_K, SCORING)
+        # Wildcard results depend on words that may not exist yet: not cached
+        cacheable = not any("*" in w for w in words)
+        results = self.cache.get(key) if cacheable else None
+        if results is None:
+            if phrase:
+                results = self.index.phrase_search(phrase.group(1), slop=slop, k=TOP_K)
+            else:
+                results = self.index.search(query, k=TOP_K, scoring=SCORING)
+            if cacheable:
+                self.cache.put(key, words, results)
+        return results
+
     def _search(self, query):
         self.history.push(query)
-        self.redo = Stack()  # clear redo stack
+        self.redo = Stack(verbose=STACK_LOG)  # clear redo stack
         print(f"\nSearching for: '{query}'")
 
         # Search local docs first
-        self.results = self.index.search(query)
+        self.results = self._lookup(query)
 
-        # If not found locally, ask GPT
+        # Then try again with misspelled words corrected
+        if not self.results and not PHRASE_QUERY.match(query.strip()):
+            suggestion = self.index.suggest_query(query)
+            if suggestion:
+                print(f"No exact matches. Showing results for: '{suggestion}'")
+                self.results = self._lookup(suggestion)
+
+        # If not found locally, reuse a saved GPT answer or ask GPT in the background
         if not self.results:
-            print("No matches found locally. Using ChatGPT...")
-            filename = f"gpt_{self.gpt_counter}.txt"
-            answer = self._ask_chatgpt(query)
-            filepath = os.path.join(self.gpt_path, filename)
-            with open(filepath, "w", encoding="utf-8") as f:
-                f.write(answer)
-            self.index.add_doc(filename.replace(".txt", ""), answer)
-            self.results = [{"doc": filename.replace(".txt", ""), "score": 1}]
-            print(f"\n--- GPT Answer ---\n{answer}\n------------------")
-            self.gpt_counter += 1
+            key = answer_key(self.index._clean_query(query))
+            doc = self.answers.get(key)
+            if doc is None:
+                if key not in self.pending:
+                    self.pending[key] = (query, self.gpt.submit(query, key))
+                print("No matches found locally. Asking ChatGPT in the background...")
+                return
+            print("No matches found locally. Showing the saved ChatGPT answer.")
+            self.results = [{"doc": doc, "score": 1}]
 
         # Show results
         for i, r in enumerate(self.results, start=1):
-            print(f"{i}. {r['doc']}.txt | Score: {r['score']}")
+            print(f"{i}. {r['doc']}.txt | Score: {r['score']:.2f}")
         self._open_doc()
 
-    def _ask_chatgpt(self, query):
-        """Query GPT using OpenAI client."""
-        try:
-            response = client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[{"role": "user", "content": query}],
-                temperature=0.7,
-                max_tokens=200
-            )
-            return response.choices[0].message.content
-        except Exception as e:
-            return f"Error accessing ChatGPT: {e}"
+    def _collect_answers(self, timeout=0):
+        """Save, index and print the GPT answers that have arrived."""
+        if timeout and self.pending:
+            wait([future for _, future in self.pending.values()], timeout=timeout)
+        for key, (query, future) in list(self.pending.items()):
+            if not future.done():
+                continue
+            del self.pending[key]
+            try:
+                answer = future.result()
+            except Exception as e:
+                print(f"\nChatGPT request for '{query}' failed: {str(e) or type(e).__name__}")
+                continue
+            doc = f"gpt_{self.gpt_counter}"
+            path = os.path.join(self.gpt_path, f"{doc}.txt")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(answer)
+            # Same file info as refresh() records, so the next start skips it
+            st = os.stat(path)
+            self.index.add_doc(doc, answer, info=(st.st_mtime_ns, st.st_size))
+            self.answers.put(key, doc)
+            self.gpt_counter += 1
+            print(f"\n--- GPT Answer for '{query}' ({doc}.txt) ---\n{answer}\n------------------")
 
     def _open_doc(self):
         """Open and display selected document."""
@@ -139,7 +232,7 @@ class SearchSim:
         self.redo.push(current)
         prev_query = self.history.peek()
         print(f"\nBack to: '{prev_query}'")
-        self.results = self.index.search(prev_query)
+        self.results = self._lookup(prev_query)
         self._open_doc()
 
     def _next(self):
@@ -150,5 +243,5 @@ class SearchSim:
         redo_query = self.redo.pop()
         self.history.push(redo_query)
         print(f"\nRedo: '{redo_query}'")
-        self.results = self.index.search(redo_query)
+        self.results = self._lookup(redo_query)
         self._open_doc()
@@ -3,21 +3,24 @@
 class Stack:
     """Custom Stack implementation using list (LIFO)."""
 
-    def __init__(self):
+    def __init__(self, verbose=True):
         self.items = []
+        self.verbose = verbose  # print every push/pop
 
     def empty(self):
         return len(self.items) == 0
 
     def push(self, x):
         self.items.append(x)
-        print(f"[Stack] Pushed: {x}")
+        if self.verbose:
+            print(f"[Stack] Pushed: {x}")
 
     def pop(self):
         if self.empty():
             return None
         val = self.items.pop()
-        print(f"[Stack] Popped: {val}")
+        if self.verbose:
+            print(f"[Stack] Popped: {val}")
         return val
 
     def peek(self):
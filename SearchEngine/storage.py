@@ -0,0 +1,237 @@
+# storage.py
+import mmap
+import struct
+import sys
+from array import array
+
+# On-disk layout of a saved index (all offsets are in bytes from file start):
+#
+#   header      magic, version, byte order, counts and section offsets
+#   doc names   utf-8 blob + offset table (doc id -> name)
+#   doc info    (mtime_ns, size) per doc id, -1 when the doc has no source file
+#   doc lengths number of words per doc id (BM25 statistics)
+#   terms       utf-8 blob sorted by bytes + offset table (term dictionary)
+#   postings    per-term start offsets, then doc ids and frequencies as uint32
+#
+# Arrays are written in the native byte order and memory-mapped on load, so
+# opening an index only touches the pages of the terms that are looked up.
+MAGIC = b"SEIX"
+FORMAT_VERSION = 2
+HEADER = struct.Struct("<4sHBxIIQ9Q")
+BYTE_ORDERS = {"little": 0, "big": 1}
+
+
+def _pad(f):
+    """Align the next section to 8 bytes."""
+    extra = f.tell() % 8
+    if extra:
+        f.write(b"\0" * (8 - extra))
+
+
+def _write_section(f, data):
+    _pad(f)
+    offset = f.tell()
+    if isinstance(data, array):
+        data.tofile(f)
+    else:
+        f.write(data)
+    return offset
+
+
+def _blob(strings):
+    """Pack strings into one utf-8 blob plus an offset table."""
+    offsets = array("Q", [0])
+    parts = []
+    total = 0
+    for s in strings:
+        b = s.encode("utf-8")
+        parts.append(b)
+        total += len(b)
+        offsets.append(total)
+    return b"".join(parts), offsets
+
+
+def write_index(path, doc_names, doc_info, doc_lengths, terms):
+    """Write an index file.
+
+    doc_names:   list of names, position = doc id
+    doc_info:    list of (mtime_ns, size) per doc id, or None if unknown
+    doc_lengths: list of word counts per doc id
+    terms:       list of (term, doc_ids, freqs) sorted by term
+
+    The file is written in place; InvertedIndex.save writes to a temporary
+    name and swaps it in once the old mapping is closed.
+    """
+    name_blob, name_idx = _blob(doc_names)
+
+    info = array("q")
+    for entry in doc_info:
+        info.extend(entry if entry else (-1, -1))
+
+    term_blob, term_idx = _blob(t for t, _, _ in terms)
+    post_idx = array("Q", [0])
+    ids = array("I")
+    freqs = array("I")
+    for _, doc_ids, tfs in terms:
+        ids.extend(doc_ids)
+        freqs.extend(tfs)
+        post_idx.append(len(ids))
+
+    with open(path, "wb") as f:
+        f.write(b"\0" * HEADER.size)
+        offsets = [_write_section(f, s) for s in
+                   (name_blob, name_idx, info, array("I", doc_lengths),
+                    term_blob, term_idx, post_idx, ids, freqs)]
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, FORMAT_VERSION, BYTE_ORDERS[sys.byteorder],
+                            len(doc_names), len(terms), len(ids), *offsets))
+
+
+class MappedIndex:
+    """Read-only, memory-mapped view of an index file written by write_index."""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError(f"Empty index file: {path}")
+        try:
+            self._parse()
+        except Exception:
+            self.close()
+            raise
+
+    def _parse(self):
+        if len(self._mm) < HEADER.size:
+            raise ValueError(f"Truncated index file: {self.path}")
+        (magic, version, order, n_docs, n_terms, total,
+         names_off, name_idx_off, info_off, lengths_off, term_blob_off,
+         term_idx_off, post_idx_off, ids_off, freqs_off) = HEADER.unpack_from(self._mm)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError(f"Unsupported index file: {self.path}")
+        self._swap = order != BYTE_ORDERS[sys.byteorder]
+        self._view = memoryview(self._mm)
+
+        name_idx = list(self._array("Q", name_idx_off, n_docs + 1))
+        info = list(self._array("q", info_off, 2 * n_docs))
+        names = bytes(self._view[names_off:names_off + name_idx[-1]])
+        self.doc_names = [names[name_idx[i]:name_idx[i + 1]].decode("utf-8")
+                          for i in range(n_docs)]
+        self.doc_info = [None if info[2 * i] < 0 else (info[2 * i], info[2 * i + 1])
+                         for i in range(n_docs)]
+        self.doc_lengths = list(self._array("I", lengths_off, n_docs))
+
+        self._term_idx = self._array("Q", term_idx_off, n_terms + 1)
+        self._term_blob = self._view[term_blob_off:term_blob_off + self._term_idx[-1]]
+        self._post_idx = self._array("Q", post_idx_off, n_terms + 1)
+        self._ids = self._array("I", ids_off, total)
+        self._freqs = self._array("I", freqs_off, total)
+        self.n_terms = n_terms
+
+    def _array(self, code, offset, count):
+        """Zero-copy typed view of a section (a swapped copy on foreign byte order)."""
+        size = array(code).itemsize
+        view = self._view[offset:offset + count * size].cast(code)
+        if self._swap:
+            copy = array(code, view.tobytes())
+            copy.byteswap()
+            view.release()
+            return copy
+        return view
+
+    def _term_bytes(self, i):
+        return bytes(self._term_blob[self._term_idx[i]:self._term_idx[i + 1]])
+
+    def find(self, term):
+        """Binary search the term dictionary; returns the term number or -1."""
+        key = term.encode("utf-8")
+        lo, hi = 0, self.n_terms
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._term_bytes(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self.n_terms and self._term_bytes(lo) == key:
+            return lo
+        return -1
+
+    def postings(self, term):
+        """Return (doc_ids, freqs) for a term, or None if it is not indexed."""
+        i = self.find(term)
+        if i < 0:
+            return None
+        start, end = self._post_idx[i], self._post_idx[i + 1]
+        return self._ids[start:end], self._freqs[start:end]
+
+    def terms(self):
+        """Iterate over all terms in dictionary order."""
+        for i in range(self.n_terms):
+            yield self._term_bytes(i).decode("utf-8")
+
+    def close(self):
+        """Unmap the file. Views still held by callers keep the mapping alive."""
+        for name in ("_term_blob", "_term_idx", "_post_idx", "_ids", "_freqs", "_view"):
+            view = getattr(self, name, None)
+            if isinstance(view, memoryview):
+                try:
+                    view.release()
+                except BufferError:
+                    pass
+        try:
+            self._mm.close()
+        except (BufferError, AttributeError):
+            pass
+        self._file.close()
+
+
+# Positions sidecar (<index>.pos): for every term of the main file, in the
+# same order, one blob holding a (varint length, positions) record per posting.
+# It is only opened by the first phrase query.
+POS_MAGIC = b"SEPS"
+POS_HEADER = struct.Struct("<4sHBxIQQ")
+
+
+def write_positions(path, blobs):
+    """Write the per-term position blobs of an index (same term order)."""
+    offsets = array("Q", [0])
+    for blob in blobs:
+        offsets.append(offsets[-1] + len(blob))
+    with open(path, "wb") as f:
+        f.write(b"\0" * POS_HEADER.size)
+        offsets_off = _write_section(f, offsets)
+        _pad(f)
+        data_off = f.tell()
+        for blob in blobs:
+            f.write(blob)
+        f.seek(0)
+        f.write(POS_HEADER.pack(POS_MAGIC, FORMAT_VERSION, BYTE_ORDERS[sys.byteorder],
+                                len(blobs), offsets_off, data_off))
+
+
+class MappedPositions:
+    """Memory-mapped positions sidecar; term blobs are sliced out on demand."""
+
+    def __init__(self, path):
+        self._file = open(path, "rb")
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, order, n_terms, offsets_off, self._data_off = \
+            POS_HEADER.unpack_from(self._mm)
+        if magic != POS_MAGIC or version != FORMAT_VERSION:
+            self.close()
+            raise ValueError(f"Unsupported positions file: {path}")
+        self._offsets = array("Q", self._mm[offsets_off:offsets_off + 8 * (n_terms + 1)])
+        if order != BYTE_ORDERS[sys.byteorder]:
+            self._offsets.byteswap()
+
+    def blob(self, term_no):
+        """Positions blob of a term, by its number in the main term dictionary."""
+        return self._mm[self._data_off + self._offsets[term_no]:
+                        self._data_off + self._offsets[term_no + 1]]
+
+    def close(self):
+        self._mm.close()
+        self._file.close()
@@ -0,0 +1,113 @@
+# terms.py
+from bisect import bisect_left
+from collections import Counter
+
+# Sorts after any character that can follow a prefix
+_MAX_CHAR = "\U0010ffff"
+
+
+def _bigrams(word):
+    """Distinct letter pairs of a word, with ^ and $ marking its ends."""
+    padded = "^" + word + "$"
+    return {padded[i:i + 2] for i in range(len(padded) - 1)}
+
+
+def _edit_distance(a, b, max_edits):
+    """Levenshtein distance of a and b, or max_edits + 1 once it must exceed max_edits."""
+    if abs(len(a) - len(b)) > max_edits:
+        return max_edits + 1
+    row = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        new = [i]
+        for j, cb in enumerate(b, 1):
+            new.append(min(new[j - 1] + 1, row[j] + 1, row[j - 1] + (ca != cb)))
+        if min(new) > max_edits:
+            return max_edits + 1
+        row = new
+    return row[-1]
+
+
+class TermDictionary:
+    """Sorted array of all indexed words, for prefix and typo-tolerant lookup.
+
+    Terms sharing a prefix are neighbours in the array, so a prefix is a
+    contiguous slice found by binary search. Typo lookup uses a bigram
+    index, built on first use, to pick the few terms worth comparing.
+    """
+
+    def __init__(self, terms=()):
+        self.terms = sorted(set(terms))
+        # Words added since the last lookup; merged lazily
+        self._pending = set()
+        # (bigram, term length) -> terms, for fuzzy()
+        self._grams = None
+        # Terms whose edit distance the last fuzzy() call computed
+        self.checked = 0
+
+    def add(self, term):
+        self._pending.add(term)
+
+    def __len__(self):
+        self._merge()
+        return len(self.terms)
+
+    def _merge(self):
+        if self._pending:
+            new = self._pending.difference(self.terms)
+            self.terms = sorted(self._pending.union(self.terms))
+            self._pending = set()
+            if self._grams is not None:
+                self._index_grams(new)
+
+    def _index_grams(self, terms):
+        grams = self._grams
+        for term in terms:
+            for gram in _bigrams(term):
+                key = (gram, len(term))
+                found = grams.get(key)
+                if found is None:
+                    grams[key] = [term]
+                else:
+                    found.append(term)
+
+    def complete(self, prefix, limit=None):
+        """Terms starting with prefix, in sorted order."""
+        self._merge()
+        start = bisect_left(self.terms, prefix)
+        end = bisect_left(self.terms, prefix + _MAX_CHAR, start)
+        if limit is not None:
+            end = min(end, start + limit)
+        return self.terms[start:end]
+
+    def fuzzy(self, word, max_edits=1):
+        """(distance, term) for every term within max_edits (Levenshtein) of word.
+
+        An edit changes at most two bigrams of a word, so a match shares at
+        least len(bigrams) - 2 * max_edits of them and differs in length by
+        at most max_edits. Only terms passing that count are compared.
+        """
+        self._merge()
+        if self._grams is None:
+            self._grams = {}
+            self._index_grams(self.terms)
+        grams = _bigrams(word)
+        needed = len(grams) - 2 * max_edits
+        lengths = range(max(len(word) - max_edits, 0), len(word) + max_edits + 1)
+        if needed > 0:
+            shared = Counter()
+            for length in lengths:
+                for gram in grams:
+                    found = self._grams.get((gram, length))
+                    if found:
+                        shared.update(found)
+            candidates = [term for term, n in shared.items() if n >= needed]
+        else:
+            # Too short for the filter: every term of a close enough length
+            candidates = [term for term in self.terms if len(term) in lengths]
+        self.checked = len(candidates)
+        found = []
+        for term in candidates:
+            distance = _edit_distance(word, term, max_edits)
+            if distance <= max_edits:
+                found.append((distance, term))
+        return found
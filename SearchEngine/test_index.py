@@ -0,0 +1,205 @@
+# test_index.py
+import os
+import random
+
+from index import InvertedIndex, _phrase_starts
+
+WORDS = ["apple", "banana", "cherry", "date", "elder", "fig", "grape", "filler"]
+
+
+def _random_text(rng):
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 40)))
+
+
+def _scores(results):
+    return {r["doc"]: round(r["score"], 9) for r in results}
+
+
+def test_bm25_top_k_matches_exhaustive_scan_after_updates():
+    rng = random.Random(7)
+    docs = {f"d{i}": _random_text(rng) for i in range(60)}
+    idx = InvertedIndex()
+    idx.auto_compact = False   # keep the tombstones in the posting lists
+    for doc, text in docs.items():
+        idx.add_doc(doc, text)
+    for doc in rng.sample(sorted(docs), 15):
+        docs[doc] = _random_text(rng)
+        idx.update_doc(doc, docs[doc])
+
+    # Same live docs, no tombstones: the reference statistics
+    fresh = InvertedIndex()
+    for doc, text in docs.items():
+        fresh.add_doc(doc, text)
+
+    for query in ["apple", "apple banana", "fig grape cherry", "filler date"]:
+        expected = _scores(fresh.search(query, scoring="bm25"))
+        assert _scores(idx.search(query, scoring="bm25")) == expected
+        best = sorted(expected.values(), reverse=True)
+        for k in (1, 3, 5):
+            top = _scores(idx.search(query, k=k, scoring="bm25"))
+            # Docs with equal scores may come in any order
+            assert sorted(top.values(), reverse=True) == best[:k]
+            assert all(expected[doc] == score for doc, score in top.items())
+        assert all(score >= 0 for score in best)
+
+
+def test_single_update_keeps_bm25_scores_positive():
+    idx = InvertedIndex()
+    idx.auto_compact = False
+    for i in range(10):
+        idx.add_doc(f"d{i}", "apple " + "filler " * (i * 3))
+    idx.update_doc("d0", "apple pie")
+    results = idx.search("apple", k=3, scoring="bm25")
+    assert [r["doc"] for r in results] == ["d0", "d1", "d2"]
+    assert all(r["score"] > 0 for r in results)
+
+
+def test_save_unmaps_the_old_file_before_replacing_it(tmp_path, monkeypatch):
+    path = str(tmp_path / "search.idx")
+    idx = InvertedIndex(positional=True)
+    idx.add_doc("a", "red apple pie")
+    idx.add_doc("b", "green apple")
+    idx.save(path)
+    idx.search("apple")   # postings now point into the mapping
+    idx.phrase_search("apple pie")
+    old_index, old_positions = idx._mapped, idx._mapped_positions
+
+    replaced = []
+
+    def replace(src, dst):
+        # What Windows enforces: the target must not be mapped any more
+        assert old_index._mm.closed and old_positions._mm.closed
+        replaced.append(dst)
+        return real_replace(src, dst)
+
+    real_replace = os.replace
+    monkeypatch.setattr(os, "replace", replace)
+    idx.update_doc("b", "green apple pie")
+    idx.save(path)
+
+    assert replaced == [path, path + ".pos"]
+    assert sorted(r["doc"] for r in idx.phrase_search("apple pie")) == ["a", "b"]
+    reloaded = InvertedIndex.load(path)
+    assert sorted(r["doc"] for r in reloaded.search("green")) == ["b"]
+    reloaded.close()
+    idx.close()
+
+
+def test_refresh_skips_docs_added_with_their_file_info(tmp_path):
+    folder = tmp_path / "docs"
+    folder.mkdir()
+    (folder / "a.txt").write_text("first document", encoding="utf-8")
+    idx = InvertedIndex()
+    idx.refresh([str(folder)], workers=1)
+
+    # Written and indexed directly, the way search.py stores GPT answers
+    path = folder / "b.txt"
+    path.write_text("second document", encoding="utf-8")
+    st = os.stat(path)
+    idx.add_doc("b", "second document", info=(st.st_mtime_ns, st.st_size))
+
+    stats = idx.refresh([str(folder)], workers=1)
+    assert (stats["added"], stats["updated"], stats["removed"]) == (0, 0, 0)
+    assert not idx._dropped
+
+
+def _follows(per_word, i, pos, slop):
+    # Reference: try every combination of positions
+    if i == len(per_word):
+        return True
+    return any(_follows(per_word, i + 1, p, slop)
+               for p in per_word[i] if pos < p <= pos + 1 + slop)
+
+
+def test_phrase_starts_matches_exhaustive_search():
+    rng = random.Random(11)
+    for _ in range(300):
+        per_word = [sorted(rng.sample(range(40), rng.randint(1, 12)))
+                    for _ in range(rng.randint(1, 4))]
+        slop = rng.randint(0, 3)
+        expected = [p for p in per_word[0] if _follows(per_word, 1, p, slop)]
+        assert _phrase_starts(per_word, slop) == expected
+
+
+def test_phrase_search_on_repeated_words():
+    idx = InvertedIndex(positional=True)
+    idx.add_doc("many", "a " * 3000)
+    idx.add_doc("few", "a b a b a")
+    # Exponential for a matcher that tries every combination of positions
+    results = idx.phrase_search("a a a a a a a a", slop=6)
+    assert results == [{"doc": "many", "score": 2993}]
+    assert idx.phrase_search("a b a", slop=0) == [{"doc": "few", "score": 2}]
+
+
+def test_compact_forgets_tombstones_it_removed():
+    idx = InvertedIndex()
+    idx.auto_compact = False
+    for i in range(50):
+        idx.add_doc(f"d{i}", "apple banana")
+    for round_no in range(20):
+        for i in range(50):
+            idx.update_doc(f"d{i}", f"apple cherry round{round_no}")
+        idx.compact()
+        # Nothing holds the old ids any more, so nothing is left to skip
+        assert not idx._dropped and not idx._uncompacted
+        assert idx._df(idx._postings("apple"), idx._dropped) == 50
+    assert len(idx.search("apple cherry")) == 50
+
+
+def test_compact_keeps_tombstones_of_lists_changed_meanwhile(tmp_path):
+    path = str(tmp_path / "search.idx")
+    idx = InvertedIndex()
+    idx.auto_compact = False
+    for i in range(4):
+        idx.add_doc(f"d{i}", "apple banana")
+    idx.save(path)
+    idx.add_doc("new", "apple")
+    idx.remove_doc("d0")    # in the saved file
+    idx.remove_doc("new")   # in memory only
+    idx.add_doc("d1", "apple")   # d1 is now in the lists held in memory
+    apple = idx._postings("apple")
+
+    class Lock:
+        # Another thread adds to the list between the copy and the swap;
+        # the list keeps its length, only d1's frequency changes
+        entered = 0
+
+        def __enter__(self):
+            Lock.entered += 1
+            if Lock.entered == 1:
+                apple.add(idx.doc_ids["d1"], 1)
+
+        def __exit__(self, *exc):
+            pass
+
+    idx._lock = Lock()
+    idx.compact()
+    assert idx._postings("apple") is apple   # not swapped, the update survives
+    assert idx.search("apple")[0] == {"doc": "d1", "score": 3}
+    assert sorted(r["doc"] for r in idx.search("apple")) == ["d1", "d2", "d3"]
+    # d0 may still be in lists not read from disk, "new" in the changed list
+    assert idx._dropped == {0, 4}
+    assert sorted(r["doc"] for r in idx.search("banana")) == ["d1", "d2", "d3"]
+    idx.close()
+
+
+def test_bulk_build_packs_short_lists_and_copies_them_on_write():
+    rng = random.Random(3)
+    docs = [(f"d{i}", _random_text(rng)) for i in range(80)]
+    packed = InvertedIndex()
+    packed.add_docs(docs)
+    plain = InvertedIndex()
+    for doc, text in docs:
+        plain.add_doc(doc, text)
+    assert not any(postings.owns_arrays for postings in packed.index.values())
+
+    # A write copies only that list out of the shared arrays
+    packed.add_doc("d0", "apple")
+    plain.add_doc("d0", "apple")
+    assert packed.index["apple"].owns_arrays
+    assert not packed.index["banana"].owns_arrays
+    for word in WORDS:
+        assert list(packed.index[word].ids) == list(plain.index[word].ids)
+        assert list(packed.index[word].freqs) == list(plain.index[word].freqs)
+    for query in ["apple", "fig grape", "cherry date elder"]:
+        assert packed.search(query, scoring="bm25") == plain.search(query, scoring="bm25")
@@ -0,0 +1,32 @@
+# test_terms.py
+import random
+
+from terms import TermDictionary, _edit_distance
+
+
+def _vocabulary(size, seed=3):
+    rng = random.Random(seed)
+    letters = "etaoinshrdlucmfwygpbvk"
+    words = set()
+    while len(words) < size:
+        words.add("".join(rng.choice(letters) for _ in range(rng.randint(3, 12))))
+    return sorted(words)
+
+
+def test_fuzzy_finds_every_close_term_and_compares_only_a_few():
+    vocab = _vocabulary(20000)
+    terms = TermDictionary(vocab)
+    for word, max_edits in [("transformer", 2), ("seaech", 2), ("indx", 1), ("aple", 1)]:
+        found = sorted(terms.fuzzy(word, max_edits))
+        expected = sorted((d, t) for t in vocab
+                          for d in [_edit_distance(word, t, max_edits)] if d <= max_edits)
+        assert found == expected
+        # The bigram filter leaves a small fraction of the vocabulary to compare
+        assert terms.checked < len(vocab) // 50
+
+
+def test_fuzzy_sees_terms_added_later():
+    terms = TermDictionary(["apple", "banana"])
+    assert terms.fuzzy("aple") == [(1, "apple")]
+    terms.add("maple")
+    assert terms.fuzzy("mapl") == [(1, "maple")]
@@ -0,0 +1,125 @@
+import subprocess
+import threading
+import time
+
+
+class TorchError(Exception):
+    """The torch did not reach the requested state."""
+
+
+# === Actuator Backends (the hardware call) ===
+class TermuxTorch:
+    """The phone's torch through termux-api, run directly without a shell."""
+
+    def __init__(self, command="termux-torch", timeout=5):
+        self.command = command
+        self.timeout = timeout
+
+    def set(self, state):
+        # Raises OSError (command missing), TimeoutExpired or CalledProcessError
+        subprocess.run([self.command, state], stdout=subprocess.DEVNULL,
+                       stderr=subprocess.DEVNULL, timeout=self.timeout, check=True)
+
+
+class FakeTorch:
+    """Off-device stand-in: records every call, optionally as slow as real hardware."""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.calls = []   # (state, time.monotonic())
+
+    def set(self, state):
+        if self.delay:
+            time.sleep(self.delay)
+        self.calls.append((state, time.monotonic()))
+
+
+BACKENDS = {"termux": TermuxTorch, "fake": FakeTorch}
+
+
+# === OOP Class: Actuator (one worker thread per light) ===
+class Actuator:
+    """Applies the requested torch state from a single long-lived thread.
+
+    set() only records the wanted state and returns at once, so request
+    handlers never wait for the hardware. The worker calls the backend one
+    call at a time, skips states the torch is already in, and when several
+    requests arrive while it is busy (on, off, on) applies only the last.
+    A backend error is logged and the state is not retried until it is
+    requested again; flush() then returns False instead of waiting.
+    """
+
+    def __init__(self, backend=None, initial="off"):
+        self.backend = backend or TermuxTorch()
+        self.wanted = initial
+        self.applied = initial
+        self.requests = 0
+        self.hardware_calls = 0
+        self.busy = False
+        self.failed = None       # wanted state whose backend call raised
+        self.last_error = None
+        self.changed = threading.Condition()
+        self.running = True
+        self.worker = threading.Thread(target=self._work, daemon=True)
+        self.worker.start()
+
+    def set(self, state):
+        with self.changed:
+            self.requests += 1
+            self.wanted = state
+            self.failed = None
+            self.changed.notify_all()
+
+    def flush(self, timeout=None):
+        """Wait until the torch is in the last requested state.
+
+        False if that state failed to apply or timeout expired first.
+        """
+        with self.changed:
+            self.changed.wait_for(lambda: not self.busy and self.wanted in (self.applied, self.failed),
+                                  timeout)
+            return not self.busy and self.applied == self.wanted
+
+    def stats(self):
+        with self.changed:
+            return {
+                "requests": self.requests,
+                "hardware_calls": self.hardware_calls,
+                "skipped": self.requests - self.hardware_calls,
+                "applied": self.applied,
+                "wanted": self.wanted,
+                "last_error": self.last_error,
+            }
+
+    def close(self, timeout=5):
+        self.flush(timeout)
+        with self.changed:
+            self.running = False
+            self.changed.notify_all()
+        self.worker.join()
+
+    def _work(self):
+        while True:
+            with self.changed:
+                self.changed.wait_for(lambda: self.wanted not in (self.applied, self.failed)
+                                      or not self.running)
+                if not self.running:
+                    return
+                state = self.wanted
+                self.busy = True
+            # Call the hardware without holding the lock so set() never blocks
+            try:
+                self.backend.set(state)
+                error = None
+            except Exception as e:   # keep the worker alive whatever the backend does
+                error = f"{type(e).__name__}: {e}"
+                print(f"⚠️ Torch {state} failed: {error}")
+            with self.changed:
+                if error is None:
+                    self.applied = state
+                elif self.wanted == state:
+                    self.failed = state
+                self.last_error = error or self.last_error
+                self.busy = False
+                self.hardware_calls += 1
+                self.changed.notify_all()
@@ -1,11 +1,13 @@
 from flask import Flask, request, jsonify
 import threading
 import requests
-import time
+
+from light_client import LightClient
 
 # === Input IP Address of Smart Flashlight Device ===
 ip = input("Enter the IP address of the smart light (e.g., 192.168.1.2): ")
 smart_light_IP = f"http://{ip}:5000"
+client = LightClient(smart_light_IP)
 
 # === OOP Class: Flashlight ===
 class SmartFlashlight:
@@ -61,22 +63,28 @@ server_thread.start()
 
 # === Client Functions ===
 def flash_on():
-    response = requests.post(f"{smart_light_IP}/flash", json={"action": "on"})
-    print("Flash ON →", response.json())
+    try:
+        print("Flash ON →", client.on())
+    except requests.RequestException as e:
+        print("Flash ON failed:", e)
 
 def flash_off():
-    response = requests.post(f"{smart_light_IP}/flash", json={"action": "off"})
-    print("Flash OFF →", response.json())
+    try:
+        print("Flash OFF →", client.off())
+    except requests.RequestException as e:
+        print("Flash OFF failed:", e)
 
 def blink():
     n = 5  # Number of blinks
     print("Blinking...")
-    while n:
-        flash_on()
-        time.sleep(0.3)
-        flash_off()
-        time.sleep(0.3)
-        n -= 1
+    # The light times the blinks itself: one request, no network jitter
+    try:
+        report = client.pattern(on_ms=300, off_ms=300, repeat=n)
+        print(f"Blinked {report['steps_done'] // 2} times in {report['achieved_ms']:.0f} ms "
+              f"(requested {report['requested_ms']:.0f} ms, "
+              f"max {report['max_late_ms']:.1f} ms late)")
+    except requests.RequestException as e:
+        print("Blink failed:", e)
 
 # === Main Menu ===
 if __name__ == "__main__":
@@ -97,6 +105,7 @@ if __name__ == "__main__":
             blink()
         elif choice == "4":
             print("Exiting...")
+            client.close()
             break
         else:
             print("Invalid choice. Please try again.")
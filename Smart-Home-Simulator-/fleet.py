@@ -0,0 +1,209 @@
+import argparse
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from light_client import LightClient
+
+
+# === OOP Class: Device Registry ===
+class DeviceRegistry:
+    """Named smart lights and their base URLs, saved as a JSON object
+    {"name": "http://ip:port", ...}. Each device keeps one pooled client."""
+
+    def __init__(self, devices=None, timeout=(2, 5), retries=1):
+        self.devices = dict(devices or {})
+        self.timeout = timeout
+        self.retries = retries
+        self._clients = {}
+        # client() is called from the fan-out threads
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path, **options):
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f), **options)
+
+    def save(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.devices, f, indent=2)
+
+    def add(self, name, url):
+        self.remove(name)
+        self.devices[name] = url
+
+    def remove(self, name):
+        self.devices.pop(name, None)
+        with self._lock:
+            client = self._clients.pop(name, None)
+        if client is not None:
+            client.close()
+
+    def names(self):
+        return list(self.devices)
+
+    def client(self, name):
+        with self._lock:
+            client = self._clients.get(name)
+            if client is None:
+                client = self._clients[name] = LightClient(self.devices[name], self.timeout, self.retries)
+            return client
+
+    def close(self):
+        with self._lock:
+            clients = list(self._clients.values())
+            self._clients.clear()
+        for client in clients:
+            client.close()
+
+
+# === OOP Class: Fleet (concurrent fan-out) ===
+class Fleet:
+    """Sends one action to many lights at once from a bounded thread pool.
+
+    Every send waits on a barrier and then fires together, so the lights
+    switch as close to simultaneously as the network allows. A device is a
+    straggler when it answers more than straggler_factor times slower than
+    the median device (and at least min_straggler_ms).
+    """
+
+    def __init__(self, registry, max_workers=32, straggler_factor=2.0, min_straggler_ms=50):
+        self.registry = registry
+        self.max_workers = max_workers
+        self.straggler_factor = straggler_factor
+        self.min_straggler_ms = min_straggler_ms
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+
+    def _send(self, name, action, fields, barrier):
+        try:
+            client = self.registry.client(name)
+        except KeyError:
+            client = None
+        if barrier is not None:
+            # Even an unknown device takes its place at the barrier
+            try:
+                barrier.wait(timeout=5)
+            except threading.BrokenBarrierError:
+                pass
+        start = time.perf_counter()
+        if client is None:
+            response, ok, error = None, False, f"unknown device {name!r}"
+        else:
+            try:
+                response = client.send(action, **fields)
+                ok, error = True, None
+            except (requests.RequestException, ValueError) as e:
+                response, ok, error = None, False, str(e) or type(e).__name__
+        return {
+            "device": name,
+            "ok": ok,
+            "latency_ms": (time.perf_counter() - start) * 1000,
+            "response": response,
+            "error": error,
+        }
+
+    def send_all(self, action, names=None, **fields):
+        """Send action to names (default: every device); returns a report dict."""
+        names = self.registry.names() if names is None else list(names)
+        # Only synchronise the start when every send gets its own thread
+        barrier = threading.Barrier(len(names)) if 1 < len(names) <= self.max_workers else None
+        start = time.perf_counter()
+        futures = [self.executor.submit(self._send, name, action, fields, barrier) for name in names]
+        results = [future.result() for future in futures]
+        return self._report(action, results, (time.perf_counter() - start) * 1000)
+
+    def _report(self, action, results, wall_ms):
+        latencies = sorted(r["latency_ms"] for r in results if r["ok"])
+        median = latencies[len(latencies) // 2] if latencies else 0.0
+        limit = max(median * self.straggler_factor, self.min_straggler_ms)
+        return {
+            "action": action,
+            "devices": len(results),
+            "ok": sum(r["ok"] for r in results),
+            "failed": [r["device"] for r in results if not r["ok"]],
+            "wall_ms": wall_ms,
+            "median_ms": median,
+            "max_ms": latencies[-1] if latencies else 0.0,
+            # Spread between first and last answer: how far out of sync the lights were
+            "spread_ms": latencies[-1] - latencies[0] if latencies else 0.0,
+            "stragglers": [r["device"] for r in results if r["ok"] and r["latency_ms"] > limit],
+            "results": results,
+        }
+
+    def on(self, names=None):
+        return self.send_all("on", names)
+
+    def off(self, names=None):
+        return self.send_all("off", names)
+
+    def close(self):
+        self.executor.shutdown()
+        self.registry.close()
+
+
+# === Local Test Fleet ===
+def start_local_lights(count, base_port=5100, host="127.0.0.1"):
+    """Run count smart_light_server apps on consecutive ports in this process.
+
+    Returns (registry, stop); stop() shuts the servers down.
+    """
+    from werkzeug.serving import make_server
+    from actuator import FakeTorch
+    from smart_light_server import SmartFlashlight, create_app
+
+    servers = []
+    registry = DeviceRegistry()
+    for i in range(count):
+        app = create_app(SmartFlashlight(FakeTorch()))
+        server = make_server(host, base_port + i, app, threaded=True)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        registry.add(f"light{i + 1}", f"http://{host}:{base_port + i}")
+
+    def stop():
+        registry.close()
+        for server in servers:
+            server.shutdown()
+
+    return registry, stop
+
+
+def print_report(report):
+    print(f"{report['action']}: {report['ok']}/{report['devices']} ok in {report['wall_ms']:.1f} ms "
+          f"(median {report['median_ms']:.1f} ms, max {report['max_ms']:.1f} ms, "
+          f"spread {report['spread_ms']:.1f} ms)")
+    for r in report["results"]:
+        state = r["response"].get("current_state") if r["ok"] else r["error"]
+        print(f"  {r['device']:<16} {r['latency_ms']:8.1f} ms  {state}")
+    if report["stragglers"]:
+        print("Stragglers:", ", ".join(report["stragglers"]))
+    if report["failed"]:
+        print("Failed:", ", ".join(report["failed"]))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Switch many smart lights at once")
+    parser.add_argument("action", choices=("on", "off"))
+    parser.add_argument("--devices", help='JSON file {"name": "http://ip:5000", ...}')
+    parser.add_argument("--local", type=int, default=0,
+                        help="start this many local test lights instead (ports 5100, 5101, ...)")
+    parser.add_argument("--workers", type=int, default=32)
+    args = parser.parse_args()
+    if not args.devices and not args.local:
+        parser.error("give --devices or --local")
+
+    stop = None
+    if args.local:
+        registry, stop = start_local_lights(args.local)
+    else:
+        registry = DeviceRegistry.load(args.devices)
+    fleet = Fleet(registry, max_workers=args.workers)
+    try:
+        print_report(fleet.send_all(args.action))
+    finally:
+        fleet.close()
+        if stop:
+            stop()
@@ -0,0 +1,181 @@
+import asyncio
+import json
+import uuid
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+class LightError(Exception):
+    """The light answered with an HTTP error status."""
+
+
+def _retry(retries):
+    # on/off are idempotent, so POSTs may be retried too
+    options = dict(total=retries, connect=retries, read=retries, status=retries,
+                   backoff_factor=0.1, status_forcelist=(502, 503, 504))
+    try:
+        return Retry(allowed_methods=frozenset({"POST"}), **options)
+    except TypeError:  # urllib3 < 1.26
+        return Retry(method_whitelist=frozenset({"POST"}), **options)
+
+
+# === OOP Class: Light Client (pooled keep-alive HTTP) ===
+class LightClient:
+    """Sends /flash actions to one smart light over a reused connection.
+
+    The requests.Session keeps the TCP connection open between commands, so
+    each command costs one round trip instead of a new handshake. Every
+    request has a (connect, read) timeout, so a hung device raises
+    requests.RequestException instead of blocking forever.
+    """
+
+    def __init__(self, base_url, timeout=(2, 5), retries=2, pool_size=4):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=_retry(retries))
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def send(self, action, path="/flash", timeout=None, **fields):
+        response = self.session.post(f"{self.base_url}{path}", json=dict(fields, action=action),
+                                     timeout=timeout or self.timeout)
+        response.raise_for_status()
+        return response.json()
+
+    def on(self):
+        return self.send("on")
+
+    def off(self):
+        return self.send("off")
+
+    def pattern(self, on_ms=300, off_ms=300, repeat=1, wait=True, token=None):
+        """Blink on the light's own clock; with wait, returns its timing report.
+
+        The token makes a retried request join the same run instead of
+        starting a second one.
+        """
+        token = token or uuid.uuid4().hex
+        timeout = self.timeout
+        if wait:
+            connect, read = timeout if isinstance(timeout, tuple) else (timeout, timeout)
+            timeout = (connect, read + (on_ms + off_ms) * repeat / 1000)
+        return self.send("start", "/pattern", timeout, on_ms=on_ms, off_ms=off_ms,
+                         repeat=repeat, wait=wait, token=token)
+
+    def cancel_pattern(self, token=None):
+        return self.send("cancel", "/pattern", token=token)
+
+    def events(self):
+        """Yield the light's state changes ({"seq", "time", "state"}) as they happen."""
+        connect, _ = self.timeout if isinstance(self.timeout, tuple) else (self.timeout, None)
+        # Read timeout above the server's 15 s keep-alive comments
+        with self.session.get(f"{self.base_url}/events", stream=True, timeout=(connect, 30)) as response:
+            response.raise_for_status()
+            for line in response.iter_lines(decode_unicode=True):
+                if line and line.startswith("data:"):
+                    yield json.loads(line[5:])
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# === OOP Class: Async Light Client (one persistent HTTP/1.1 connection) ===
+class AsyncLightClient:
+    """asyncio version of LightClient with no extra dependencies.
+
+    Speaks HTTP/1.1 over a single keep-alive connection, one request at a
+    time; if the server dropped the idle connection it reconnects once.
+    """
+
+    def __init__(self, host, port=5000, timeout=5):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self._reader = None
+        self._writer = None
+        self._lock = None  # created inside the running loop
+
+    async def send(self, action, path="/flash", **fields):
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        body = json.dumps(dict(fields, action=action)).encode("utf-8")
+        request = (f"POST {path} HTTP/1.1\r\n"
+                   f"Host: {self.host}:{self.port}\r\n"
+                   "Content-Type: application/json\r\n"
+                   f"Content-Length: {len(body)}\r\n"
+                   "Connection: keep-alive\r\n\r\n").encode("ascii") + body
+        async with self._lock:
+            for attempt in range(2):
+                reused = self._writer is not None
+                try:
+                    return await asyncio.wait_for(self._exchange(request), self.timeout)
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    await self.close()
+                    if attempt or not reused:
+                        raise
+                except asyncio.TimeoutError:
+                    await self.close()
+                    raise
+
+    async def _exchange(self, request):
+        if self._writer is None:
+            self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+        self._writer.write(request)
+        await self._writer.drain()
+
+        status_line = await self._reader.readline()
+        if not status_line:
+            raise ConnectionResetError("connection closed by the light")
+        status = int(status_line.split()[1])
+        headers = {}
+        while True:
+            line = await self._reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        if headers.get("transfer-encoding", "").lower() == "chunked":
+            body = b""
+            while True:
+                size = int((await self._reader.readline()).split(b";")[0], 16)
+                if size == 0:
+                    await self._reader.readline()
+                    break
+                body += await self._reader.readexactly(size)
+                await self._reader.readline()
+        elif "content-length" in headers:
+            body = await self._reader.readexactly(int(headers["content-length"]))
+        else:
+            body = await self._reader.read()   # ends when the server closes
+            headers["connection"] = "close"
+
+        if headers.get("connection", "").lower() == "close" or status_line.startswith(b"HTTP/1.0"):
+            await self.close()
+        if status >= 400:
+            raise LightError(f"HTTP {status}: {body[:200]!r}")
+        return json.loads(body)
+
+    async def on(self):
+        return await self.send("on")
+
+    async def off(self):
+        return await self.send("off")
+
+    async def close(self):
+        writer, self._reader, self._writer = self._writer, None, None
+        if writer is not None:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except (ConnectionError, OSError):
+                pass
@@ -1,21 +1,104 @@
-from flask import Flask, request, jsonify
-import os
+from flask import Flask, Response, request, jsonify
+from werkzeug.serving import WSGIRequestHandler
+
+from actuator import Actuator, BACKENDS, TorchError
+from collections import deque
+import argparse
+import json
+import threading
+import time
+import uuid
+
+# === OOP Class: State Broadcaster (fan-out to /events subscribers) ===
+class StateBroadcaster:
+    """Numbers every state change and hands it to all subscribers.
+
+    Each subscriber has its own bounded queue: when a slow client falls
+    more than queue_size events behind, its oldest events are dropped (and
+    counted) instead of making publish() wait, so commands never block on
+    a dashboard.
+    """
+
+    def __init__(self, queue_size=64, max_subscribers=4):
+        self.queue_size = queue_size
+        # Every open stream holds a server thread, so keep some for commands
+        self.max_subscribers = max_subscribers
+        self.lock = threading.Condition()
+        self.seq = 0
+        self.last = None
+        self.subscribers = []
+
+    def publish(self, state):
+        with self.lock:
+            self.seq += 1
+            self.last = {"seq": self.seq, "time": time.time(), "state": state}
+            for queue in self.subscribers:
+                if len(queue["events"]) == self.queue_size:
+                    queue["dropped"] += 1
+                queue["events"].append(self.last)   # deque(maxlen) drops the oldest
+            self.lock.notify_all()
+            return self.last
+
+    def subscribe(self):
+        """A new subscriber queue, or None when max_subscribers are connected."""
+        with self.lock:
+            if len(self.subscribers) >= self.max_subscribers:
+                return None
+            queue = {"events": deque(maxlen=self.queue_size), "dropped": 0}
+            self.subscribers.append(queue)
+            return queue
+
+    def unsubscribe(self, queue):
+        with self.lock:
+            if queue in self.subscribers:
+                self.subscribers.remove(queue)
+
+    def next_events(self, queue, timeout):
+        """(events, dropped) waiting up to timeout; both empty on timeout."""
+        with self.lock:
+            self.lock.wait_for(lambda: queue["events"], timeout)
+            events = list(queue["events"])
+            queue["events"].clear()
+            dropped, queue["dropped"] = queue["dropped"], 0
+            return events, dropped
 
 # === OOP Class: Smart Flashlight ===
 class SmartFlashlight:
-    def __init__(self):
+    # Seconds to wait for a switch: a call already running plus our own
+    SWITCH_TIMEOUT = 12
+
+    def __init__(self, backend=None):
         self.state = "off"
+        # The torch is switched by the actuator's worker thread, not the request
+        self.actuator = Actuator(backend)
+        self.events = StateBroadcaster()
+        self.lock = threading.Lock()
 
     def turn_on(self):
-        os.system("termux-torch on")
-        self.state = "on"
+        self._set("on")
         return "Smart Flashlight is ON"
 
     def turn_off(self):
-        os.system("termux-torch off")
-        self.state = "off"
+        self._set("off")
         return "Smart Flashlight is OFF"
 
+    def _set(self, state):
+        # Under one lock, so events are numbered in the order states were set
+        with self.lock:
+            self.actuator.set(state)
+            if state != self.state:
+                self.state = state
+                self.events.publish(state)
+
+    def confirm(self, state):
+        """Wait until the torch has switched to state, or raise TorchError.
+
+        Pattern steps call this, so a state is not coalesced away by the next.
+        """
+        if not self.actuator.flush(self.SWITCH_TIMEOUT):
+            error = self.actuator.last_error if self.actuator.failed == state else "timed out"
+            raise TorchError(f"torch did not switch {state}: {error}")
+
     def get_state(self):
         return self.state
 
@@ -32,21 +115,228 @@ class FlashController:
         else:
             return "Invalid action"
 
+# === OOP Class: Pattern Player (server-side blink scheduler) ===
+class PatternPlayer:
+    """Plays on/off patterns on the light in a background thread.
+
+    Each step is due at a fixed offset from the pattern start on the
+    monotonic clock, so a late step does not push back the ones after it.
+    Every run has a token; posting the same token again returns that run
+    instead of starting a new one, and starting a run cancels the current.
+    """
+
+    MAX_STEPS = 10000
+    MAX_RUNS = 50   # finished reports kept for /pattern/<token>
+
+    def __init__(self, controller):
+        self.controller = controller
+        self.lock = threading.Lock()
+        self.runs = {}
+        self.current = None
+
+    def start(self, steps, repeat=1, token=None):
+        """steps: [(action, ms), ...] played repeat times; returns the run."""
+        with self.lock:
+            if token and token in self.runs:
+                return self.runs[token]
+            if self.current is not None:
+                self.current["cancel"].set()
+            run = {
+                "token": token or uuid.uuid4().hex,
+                "status": "running",
+                "steps": steps,
+                "repeat": repeat,
+                "steps_done": 0,
+                "cancel": threading.Event(),
+                "done": threading.Event(),
+            }
+            self.runs[run["token"]] = run
+            while len(self.runs) > self.MAX_RUNS:
+                del self.runs[next(iter(self.runs))]
+            self.current = run
+        threading.Thread(target=self._play, args=(run,), daemon=True).start()
+        return run
+
+    def cancel(self, token=None):
+        """Cancel the run with token (default: the current one); returns it or None."""
+        with self.lock:
+            run = self.runs.get(token) if token else self.current
+            if run is not None:
+                run["cancel"].set()
+            return run
+
+    def _play(self, run):
+        cancel = run["cancel"]
+        start = time.monotonic()
+        due = 0.0        # requested offset of the next step, in seconds
+        late = []        # how late the torch switched for each step, in ms
+        steps = (step for _ in range(run["repeat"]) for step in run["steps"])
+        for action, ms in steps:
+            if cancel.wait(max(0.0, start + due - time.monotonic())):
+                break
+            # start() and cancel() set the flag under this lock, so once a
+            # run is cancelled it cannot switch the torch again
+            with self.lock:
+                if cancel.is_set():
+                    break
+                self.controller.handle_action(action)
+            try:
+                self.controller.flashlight.confirm(action)
+            except TorchError as e:
+                run["error"] = str(e)
+                break
+            # Measured once the torch has actually switched
+            late.append((time.monotonic() - start - due) * 1000)
+            run["steps_done"] += 1
+            due += ms / 1000
+        else:
+            # Hold the last step for its full duration
+            cancel.wait(max(0.0, start + due - time.monotonic()))
+
+        run["status"] = "failed" if "error" in run else "cancelled" if cancel.is_set() else "done"
+        run["requested_ms"] = sum(ms for _, ms in run["steps"]) * run["repeat"]
+        run["achieved_ms"] = (time.monotonic() - start) * 1000
+        run["mean_late_ms"] = sum(late) / len(late) if late else 0.0
+        run["max_late_ms"] = max(late) if late else 0.0
+        with self.lock:
+            if self.current is run:
+                self.current = None
+        run["done"].set()
+
+    @staticmethod
+    def report(run):
+        keys = ("token", "status", "error", "repeat", "steps_done", "requested_ms",
+                "achieved_ms", "mean_late_ms", "max_late_ms")
+        result = {key: run[key] for key in keys if key in run}
+        result["total_steps"] = len(run["steps"]) * run["repeat"]
+        return result
+
+
+def parse_pattern(data):
+    """(steps, repeat) from a /pattern request, or raise ValueError.
+
+    Either "steps": [["on", 300], ["off", 300], ...] or the blink shorthand
+    "on_ms" / "off_ms"; durations are milliseconds.
+    """
+    if "steps" in data:
+        steps = [(str(action), float(ms)) for action, ms in data["steps"]]
+    else:
+        steps = [("on", float(data.get("on_ms", 300))), ("off", float(data.get("off_ms", 300)))]
+    repeat = int(data.get("repeat", 1))
+    if not steps or repeat < 1:
+        raise ValueError("need at least one step and repeat >= 1")
+    if any(action not in ("on", "off") or not 0 <= ms <= 60000 for action, ms in steps):
+        raise ValueError("steps must be 'on'/'off' with 0-60000 ms")
+    if len(steps) * repeat > PatternPlayer.MAX_STEPS:
+        raise ValueError(f"pattern longer than {PatternPlayer.MAX_STEPS} steps")
+    return steps, repeat
+
+def sse(event):
+    return f"id: {event['seq']}\nevent: state\ndata: {json.dumps(event)}\n\n"
+
 # === Flask App Setup ===
-app = Flask(__name__)
-smart_light = SmartFlashlight()
-controller = FlashController(smart_light)
-
-@app.route('/flash', methods=['POST'])
-def control_flash():
-    data = request.get_json()
-    action = data.get("action", "")
-    result = controller.handle_action(action)
-    return jsonify({
-        "status": result,
-        "current_state": smart_light.get_state()
-    })
+def create_app(flashlight=None):
+    # One app per light, so several can run side by side (e.g. on different ports)
+    app = Flask(__name__)
+    smart_light = flashlight or SmartFlashlight()
+    controller = FlashController(smart_light)
+    player = PatternPlayer(controller)
+    app.config["SMART_LIGHT"] = smart_light
+    app.config["PATTERN_PLAYER"] = player
+
+    @app.route('/flash', methods=['POST'])
+    def control_flash():
+        data = request.get_json()
+        action = data.get("action", "")
+        player.cancel()   # a direct command overrides a running pattern
+        result = controller.handle_action(action)
+        return jsonify({
+            "status": result,
+            "current_state": smart_light.get_state()
+        })
+
+    @app.route('/events', methods=['GET'])
+    def state_events():
+        # Server-Sent Events: the current state, then one event per change
+        events = smart_light.events
+        queue = events.subscribe()
+        if queue is None:
+            return jsonify({"error": "too many subscribers"}), 503
+
+        def stream():
+            try:
+                with events.lock:
+                    first = events.last or {"seq": events.seq, "time": time.time(),
+                                            "state": smart_light.get_state()}
+                    queue["events"].clear()   # already covered by first
+                yield sse(first)
+                while True:
+                    pending, dropped = events.next_events(queue, timeout=15)
+                    if not pending:
+                        yield ": keep-alive\n\n"   # also notices closed connections
+                    for event in pending:
+                        if dropped:
+                            event = dict(event, dropped=dropped)
+                            dropped = 0
+                        yield sse(event)
+            finally:
+                events.unsubscribe(queue)
+
+        return Response(stream(), mimetype="text/event-stream",
+                        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+    @app.route('/pattern', methods=['POST'])
+    def control_pattern():
+        # {"action": "start", "on_ms": 300, "off_ms": 300, "repeat": 5, "token": "...", "wait": true}
+        # {"action": "cancel", "token": "..."}
+        data = request.get_json() or {}
+        if data.get("action") == "cancel":
+            run = player.cancel(data.get("token"))
+            if run is None:
+                return jsonify({"error": "no such pattern"}), 404
+            run["done"].wait(1)
+            return jsonify(player.report(run))
+        try:
+            steps, repeat = parse_pattern(data)
+        except (TypeError, ValueError) as e:
+            return jsonify({"error": str(e)}), 400
+        run = player.start(steps, repeat, data.get("token"))
+        if data.get("wait"):
+            run["done"].wait()
+            return jsonify(player.report(run))
+        return jsonify(player.report(run)), 202
+
+    @app.route('/pattern/<token>', methods=['GET'])
+    def pattern_status(token):
+        run = player.runs.get(token)
+        if run is None:
+            return jsonify({"error": "no such pattern"}), 404
+        return jsonify(player.report(run))
+
+    return app
+
+# === Run Server ===
+def run_server(host='0.0.0.0', port=5000, app=None):
+    # Keep-alive lets the controller reuse one connection for every command.
+    # Waitress supports it; recent Flask dev servers close after each reply.
+    # The app is built here, not at import, so importing this module never
+    # starts a torch worker; off the phone pass an app with a FakeTorch.
+    if app is None:
+        app = create_app()
+    try:
+        from waitress import serve
+    except ImportError:
+        WSGIRequestHandler.protocol_version = "HTTP/1.1"  # keep-alive on older Werkzeug
+        app.run(host=host, port=port, threaded=True)
+    else:
+        serve(app, host=host, port=port, threads=8)
 
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Smart light server")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=5000)
+    parser.add_argument("--backend", choices=sorted(BACKENDS), default="termux",
+                        help="fake = no torch, for running off the phone")
+    args = parser.parse_args()
     print("🚀 Smart Light Server is running on your phone...")
-    app.run(host='0.0.0.0', port=5000)
+    run_server(args.host, args.port, create_app(SmartFlashlight(BACKENDS[args.backend]())))
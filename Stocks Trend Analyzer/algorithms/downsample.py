@@ -0,0 +1,78 @@
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def minmax_indices(y, n_buckets, start=0, end=None):
+    """Indices of the lowest and highest point of each of n_buckets equal
+    slices of y[start:end], in order. Keeps every spike visible."""
+    end = len(y) if end is None else end
+    n = end - start
+    if n <= 2 * n_buckets:
+        return list(range(start, end))
+    size = -(-n // n_buckets)   # ceiling division
+    n_buckets = -(-n // size)
+    if np is not None:
+        values = np.asarray(y[start:end], dtype=np.float64)
+        # Pad the last bucket with its final value so every bucket is full
+        padded = np.pad(values, (0, size * n_buckets - n), mode="edge").reshape(n_buckets, size)
+        base = np.arange(n_buckets) * size
+        lows = np.minimum(base + padded.argmin(axis=1), n - 1)
+        highs = np.minimum(base + padded.argmax(axis=1), n - 1)
+        picked = np.unique(np.concatenate((lows, highs))) + start
+        return picked.tolist()
+    picked = []
+    for b in range(start, end, size):
+        bucket_end = min(b + size, end)
+        low = high = b
+        for i in range(b + 1, bucket_end):
+            if y[i] < y[low]:
+                low = i
+            elif y[i] > y[high]:
+                high = i
+        picked.extend((low, high) if low < high else (high, low) if high < low else (low,))
+    return picked
+
+
+def lttb_indices(x, y, n_out):
+    """Largest-Triangle-Three-Buckets: the n_out points of (x, y) that best
+    keep the line's visual shape. Returns positions into x and y."""
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return list(range(n))
+    every = (n - 2) / (n_out - 2)
+    picked = [0]
+    a = 0
+    for i in range(n_out - 2):
+        # Average of the next bucket is the third corner of the triangle
+        next_start = int((i + 1) * every) + 1
+        next_end = min(int((i + 2) * every) + 1, n)
+        count = next_end - next_start
+        avg_x = sum(x[next_start:next_end]) / count
+        avg_y = sum(y[next_start:next_end]) / count
+
+        ax, ay = x[a], y[a]
+        best, best_area = -1, -1.0
+        for j in range(int(i * every) + 1, int((i + 1) * every) + 1):
+            area = abs((ax - avg_x) * (y[j] - ay) - (ax - x[j]) * (avg_y - ay))
+            if area > best_area:
+                best, best_area = j, area
+        picked.append(best)
+        a = best
+    picked.append(n - 1)
+    return picked
+
+
+def downsample(y, n_out, start=0, end=None):
+    """About n_out indices into y[start:end] (x is the index) to draw in its place.
+
+    Min/max buckets first cut the series down cheaply without losing
+    extremes, then LTTB picks the final points from those (MinMaxLTTB).
+    """
+    end = len(y) if end is None else end
+    if end - start <= n_out:
+        return list(range(start, end))
+    candidates = minmax_indices(y, 2 * n_out, start, end)
+    values = [y[i] for i in candidates]
+    return [candidates[i] for i in lttb_indices(candidates, values, n_out)]
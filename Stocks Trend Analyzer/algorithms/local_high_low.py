@@ -1,11 +1,39 @@
 from dsa.stack import Stack
 
+
+def _previous_at_least(values):
+    # Index of the nearest earlier value >= values[i], or -1
+    stack = Stack()
+    result = []
+    for i, value in enumerate(values):
+        while not stack.is_empty() and values[stack.peek()] < value:
+            stack.pop()
+        result.append(-1 if stack.is_empty() else stack.peek())
+        stack.push(i)
+    return result
+
+
+def _valley_before_higher(values):
+    # Lowest value between i and the nearest earlier value > values[i]
+    # (or the series start); inf for i == 0. Each stack entry remembers the
+    # lowest value of the stretch it covers, so popping merges stretches.
+    stack = Stack()
+    result = []
+    for i, value in enumerate(values):
+        low = float("inf")
+        while not stack.is_empty() and values[stack.peek()[0]] <= value:
+            j, low_j = stack.pop()
+            low = min(low, low_j, values[j])
+        result.append(low)
+        stack.push((i, low))
+    return result
+
+
 class LocalHighLow:
     def __init__(self, prices):
         self.prices = prices
-    
+
     def find_local_extremes(self):
-        stack = Stack()
         extremes = []
         n = len(self.prices)
         for i in range(n):
@@ -16,3 +44,27 @@ class LocalHighLow:
             elif self.prices[i] < self.prices[i-1] and self.prices[i] < self.prices[i+1]:
                 extremes.append((i, "Low", self.prices[i]))
         return extremes
+
+    def find_swing_points(self, window=5, min_prominence=0):
+        """Highs/lows that beat every price within `window` days on both sides
+        and stand at least min_prominence above (below) the surrounding prices.
+
+        Prominence is the drop from the point to the higher of the two lowest
+        points met before reaching a higher price on either side. Everything
+        comes from monotonic stack passes, so this is O(n) for any window.
+        window=1, min_prominence=0 gives the same points as find_local_extremes.
+        """
+        n = len(self.prices)
+        points = []
+        for kind, values in (("High", list(self.prices)), ("Low", [-p for p in self.prices])):
+            before = _previous_at_least(values)
+            after = [n - 1 - j for j in reversed(_previous_at_least(values[::-1]))]
+            left_valley = _valley_before_higher(values)
+            right_valley = _valley_before_higher(values[::-1])[::-1]
+            for i in range(window, n - window):
+                if i - before[i] > window and after[i] - i > window:
+                    prominence = values[i] - max(left_valley[i], right_valley[i])
+                    if prominence >= min_prominence:
+                        points.append((i, kind, self.prices[i]))
+        points.sort()
+        return points
@@ -1,15 +1,16 @@
-from dsa.queue import Queue
+from dsa.ring_buffer import RingBuffer
 
 class MovingAverage:
     def __init__(self, window_size):
         self.window_size = window_size
-    
+
     def calculate(self, prices):
-        q = Queue()
+        # Ring buffer: O(1) per price, and its compensated sum doesn't drift
+        q = RingBuffer(self.window_size)
         moving_avgs = []
         for price in prices:
-            q.enqueue(price)
-            if q.size() > self.window_size:
+            if q.is_full():
                 q.dequeue()
+            q.enqueue(price)
             moving_avgs.append(q.average())
         return moving_avgs
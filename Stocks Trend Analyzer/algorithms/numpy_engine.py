@@ -0,0 +1,111 @@
+try:
+    import numpy as np
+except ImportError:  # the pure-Python classes keep working without NumPy
+    np = None
+
+try:
+    from numpy.lib.stride_tricks import sliding_window_view
+except ImportError:  # NumPy < 1.20
+    sliding_window_view = None
+
+from dsa.array_list import ArrayList
+from algorithms.trend_analysis import TrendAnalysis
+from algorithms.moving_average import MovingAverage
+from algorithms.max_profit import MaxProfit
+from algorithms.local_high_low import LocalHighLow
+
+AVAILABLE = np is not None
+
+
+class NumpyEngine:
+    """Vectorized versions of the four analyses, same results as the classes.
+
+    Every method works on whole arrays at once instead of looping in Python,
+    which matters for long (tick / minute) price histories. Prices must not
+    be NaN (load_csv drops those rows); NaN compares differently here.
+    """
+
+    def __init__(self, prices):
+        if np is None:
+            raise ImportError("NumpyEngine needs numpy (pip install numpy)")
+        self.prices = np.asarray(prices, dtype=np.float64)
+
+    def detect_trends(self):
+        # Streak after each day, like TrendAnalysis: +k for the k-th rise in a
+        # row, -k for the k-th fall, 0 when unchanged
+        d = np.sign(np.diff(self.prices)).astype(np.int64)
+        if d.size == 0:
+            return d
+        idx = np.arange(d.size)
+        starts = np.ones(d.size, dtype=bool)
+        starts[1:] = d[1:] != d[:-1]
+        run_start = np.maximum.accumulate(np.where(starts, idx, 0))
+        streaks = d * (idx - run_start + 1)
+        # TrendAnalysis starts counting at 1, so an opening rise counts one extra
+        if d[0] > 0:
+            streaks[run_start == 0] += 1
+        return streaks
+
+    def moving_average(self, window):
+        # Average of the last `window` prices (fewer at the start). Each full
+        # window is summed on its own: one running prefix sum over the whole
+        # series would carry its rounding error into every later window.
+        if window < 1:
+            raise ValueError("Window must be positive")
+        p = self.prices
+        head = min(window - 1, p.size)
+        result = np.empty(p.size)
+        result[:head] = np.cumsum(p[:head]) / np.arange(1, head + 1)
+        if p.size >= window:
+            if sliding_window_view is not None:
+                sums = sliding_window_view(p, window).sum(axis=1)
+            else:
+                sums = np.convolve(p, np.ones(window), "valid")
+            result[head:] = sums / window
+        return result
+
+    def best_interval(self):
+        p = self.prices
+        if p.size == 0:
+            return None, None, 0
+        profit = p - np.minimum.accumulate(p)
+        sell_day = int(np.argmax(profit))  # first best, like MaxProfit
+        if profit[sell_day] <= 0:
+            return 0, 0, 0
+        buy_day = int(np.argmin(p[:sell_day]))
+        return buy_day, sell_day, float(profit[sell_day])
+
+    def find_local_extremes(self):
+        p = self.prices
+        if p.size < 3:
+            return []
+        mid = p[1:-1]
+        highs = (mid > p[:-2]) & (mid > p[2:])
+        lows = (mid < p[:-2]) & (mid < p[2:])
+        return [(int(i) + 1, "High" if highs[i] else "Low", float(mid[i]))
+                for i in np.flatnonzero(highs | lows)]
+
+
+def verify(prices, window):
+    """Run both engines on prices and return a list of the analyses that differ.
+
+    Moving averages are compared with a relative tolerance of 1e-12: the
+    window sums may round differently in the last bit.
+    """
+    prices = [float(x) for x in prices]
+    engine = NumpyEngine(prices)
+    array_list = ArrayList()
+    for x in prices:
+        array_list.append(x)
+
+    mismatches = []
+    if list(engine.detect_trends()) != TrendAnalysis(array_list).detect_trends().data:
+        mismatches.append("trends")
+    ma = MovingAverage(window).calculate(prices)
+    if len(ma) != len(prices) or not np.allclose(engine.moving_average(window), ma, rtol=1e-12, atol=0):
+        mismatches.append("moving_average")
+    if engine.best_interval() != MaxProfit(prices).best_interval():
+        mismatches.append("max_profit")
+    if engine.find_local_extremes() != LocalHighLow(prices).find_local_extremes():
+        mismatches.append("local_extremes")
+    return mismatches
@@ -0,0 +1,120 @@
+# Node of the segment tree over a range of days:
+#   (min price, first day of it, max price, first day of it,
+#    best single-trade profit, earliest sell day reaching it or None)
+_MIN, _MIN_DAY, _MAX, _MAX_DAY, _BEST, _SELL = range(6)
+
+
+def _merge(left, right):
+    if left is None:
+        return right
+    if right is None:
+        return left
+    low = left if left[_MIN] <= right[_MIN] else right
+    high = left if left[_MAX] >= right[_MAX] else right
+    # Best trade: inside left, buying in left and selling in right, or
+    # inside right; the earliest sell day wins ties, like MaxProfit
+    best, sell = left[_BEST], left[_SELL]
+    cross = right[_MAX] - left[_MIN]
+    if cross > best:
+        best, sell = cross, right[_MAX_DAY]
+    if right[_BEST] > best or (right[_BEST] == best and best > 0 and right[_SELL] < sell):
+        best, sell = right[_BEST], right[_SELL]
+    return (low[_MIN], low[_MIN_DAY], high[_MAX], high[_MAX_DAY], best, sell)
+
+
+class RangeProfit:
+    """MaxProfit for any range of days, each query O(log n).
+
+    A segment tree whose nodes keep the range's min, max and best
+    single-trade profit; a query merges the O(log n) nodes covering
+    [start, end]. Results match MaxProfit(prices[start:end + 1]) with days
+    counted from the start of the full series.
+    """
+
+    def __init__(self, prices):
+        self.n = len(prices)
+        size = 1
+        while size < self.n:
+            size *= 2
+        self.size = size
+        self.tree = [None] * (2 * size)
+        for i, price in enumerate(prices):
+            self.tree[size + i] = (price, i, price, i, 0, None)
+        for node in range(size - 1, 0, -1):
+            self.tree[node] = _merge(self.tree[2 * node], self.tree[2 * node + 1])
+
+    def _query(self, start, end):
+        if not 0 <= start <= end < self.n:
+            raise IndexError("Range out of bounds")
+        left, right = None, None
+        lo, hi = start + self.size, end + self.size + 1
+        while lo < hi:
+            if lo & 1:
+                left = _merge(left, self.tree[lo])
+                lo += 1
+            if hi & 1:
+                hi -= 1
+                right = _merge(self.tree[hi], right)
+            lo //= 2
+            hi //= 2
+        return _merge(left, right)
+
+    def range_min(self, start, end):
+        """(lowest price, its first day) in days start..end."""
+        node = self._query(start, end)
+        return node[_MIN], node[_MIN_DAY]
+
+    def range_max(self, start, end):
+        """(highest price, its first day) in days start..end."""
+        node = self._query(start, end)
+        return node[_MAX], node[_MAX_DAY]
+
+    def best_interval(self, start=0, end=None):
+        """(buy day, sell day, profit) of the best single trade in days start..end."""
+        if self.n == 0:
+            return None, None, 0
+        end = self.n - 1 if end is None else end
+        node = self._query(start, end)
+        if node[_SELL] is None:
+            return start, start, 0   # prices only fall: no trade
+        sell = node[_SELL]
+        _, buy = self.range_min(start, sell - 1)
+        return buy, sell, node[_BEST]
+
+
+def max_profit_k(prices, k=None, fee=0):
+    """Best total profit with at most k trades (k=None: unlimited), paying
+    fee per completed trade. Returns (profit, [(buy day, sell day), ...]).
+
+    O(n * k) dynamic programming over "holding after the j-th buy" and
+    "flat after the j-th sell" states. Each state also remembers its trades
+    as a shared linked list, so the trades come out without a second pass.
+    """
+    if k is None or k >= len(prices) // 2:
+        # Enough trades to take every rise: two states suffice, O(n)
+        k = None
+    if k == 0 or not prices:
+        return 0, []
+
+    slots = 1 if k is None else k
+    # flat[j] / holding[j]: (profit, trades) with j trades started
+    flat = [(0, None)] * (slots + 1)
+    holding = [(float("-inf"), None, None)] * (slots + 1)
+    for day, price in enumerate(prices):
+        for j in range(slots, 0, -1):
+            value, trades, buy_day = holding[j]
+            if value + price - fee > flat[j][0]:
+                flat[j] = (value + price - fee, (trades, (buy_day, day)))
+            # Unlimited trades: buying again only needs the single flat state
+            previous = flat[j] if k is None else flat[j - 1]
+            if previous[0] - price > value:
+                holding[j] = (previous[0] - price, previous[1], day)
+
+    best = max(flat, key=lambda state: state[0])
+    trades = []
+    node = best[1]
+    while node is not None:
+        node, trade = node
+        trades.append(trade)
+    trades.reverse()
+    return best[0], trades
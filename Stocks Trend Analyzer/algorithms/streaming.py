@@ -0,0 +1,154 @@
+from collections import deque
+
+from dsa.ring_buffer import RingBuffer
+
+
+class StreamingTrend:
+    """TrendAnalysis one price at a time: update returns the new streak."""
+
+    def __init__(self):
+        self.last = None
+        self.streak = 1   # TrendAnalysis starts counting from 1
+
+    def update(self, price):
+        last, self.last = self.last, price
+        if last is None:
+            return None   # no trend until there are two prices
+        if price > last:
+            self.streak = self.streak + 1 if self.streak > 0 else 1
+        elif price < last:
+            self.streak = self.streak - 1 if self.streak < 0 else -1
+        else:
+            self.streak = 0
+        return self.streak
+
+
+class StreamingMovingAverage:
+    def __init__(self, window_size):
+        self.window = RingBuffer(window_size)
+
+    def update(self, price):
+        if self.window.is_full():
+            self.window.dequeue()
+        self.window.enqueue(price)
+        return self.window.average()
+
+
+class StreamingMaxProfit:
+    """MaxProfit kept up to date: the running minimum and best pair so far."""
+
+    def __init__(self):
+        self.count = 0
+        self.min_price = None
+        self.min_index = 0
+        self.buy_day = None
+        self.sell_day = None
+        self.max_profit = 0
+
+    def update(self, price):
+        i = self.count
+        self.count += 1
+        if i == 0:
+            self.min_price = price
+            self.buy_day = self.sell_day = 0
+        if price - self.min_price > self.max_profit:
+            self.max_profit = price - self.min_price
+            self.buy_day = self.min_index
+            self.sell_day = i
+        if price < self.min_price:
+            self.min_price = price
+            self.min_index = i
+        return self.best_interval()
+
+    def best_interval(self):
+        return self.buy_day, self.sell_day, self.max_profit
+
+
+class StreamingExtremes:
+    """LocalHighLow on a feed: a price is judged once the next one arrives."""
+
+    def __init__(self):
+        self.count = 0
+        self.before = None   # the two latest prices
+        self.middle = None
+
+    def update(self, price):
+        # Returns the (index, kind, price) the new price confirms, or None
+        i = self.count
+        self.count += 1
+        before, middle = self.before, self.middle
+        self.before, self.middle = middle, price
+        if i < 2:
+            return None
+        if middle > before and middle > price:
+            return (i - 1, "High", middle)
+        if middle < before and middle < price:
+            return (i - 1, "Low", middle)
+        return None
+
+
+class StreamingAnalyzer:
+    """All four analyses, updated in O(1) amortized per new price.
+
+    Headless: feed prices from any source with update() or extend() and read
+    the latest results from snapshot(). Memory stays constant however long
+    the feed runs: only the latest values are kept, plus the last `history`
+    prices, trends, averages and extremes (history=None keeps them all,
+    matching what the batch classes return for the same prices).
+    """
+
+    def __init__(self, window_size=5, history=0):
+        self.window_size = window_size
+        self.count = 0
+        self.latest = {"price": None, "streak": None, "moving_avg": None, "extreme": None}
+        self.prices = deque(maxlen=history)
+        self.trends = deque(maxlen=history)
+        self.moving_avg = deque(maxlen=history)
+        self.extremes = deque(maxlen=history)
+        self._trend = StreamingTrend()
+        self._moving_avg = StreamingMovingAverage(window_size)
+        self._profit = StreamingMaxProfit()
+        self._extremes = StreamingExtremes()
+
+    def update(self, price):
+        latest = self.latest
+        self.count += 1
+        latest["price"] = price
+        self.prices.append(price)
+        streak = self._trend.update(price)
+        if streak is not None:
+            latest["streak"] = streak
+            self.trends.append(streak)
+        latest["moving_avg"] = self._moving_avg.update(price)
+        self.moving_avg.append(latest["moving_avg"])
+        self._profit.update(price)
+        extreme = self._extremes.update(price)
+        if extreme is not None:
+            latest["extreme"] = extreme
+            self.extremes.append(extreme)
+        return self.snapshot()
+
+    def extend(self, prices):
+        for price in prices:
+            self.update(price)
+        return self.snapshot()
+
+    def best_interval(self):
+        if not self.count:
+            return None, None, 0
+        return self._profit.best_interval()
+
+    def snapshot(self):
+        """Latest values, cheap to build after every tick."""
+        buy_day, sell_day, profit = self.best_interval()
+        latest = self.latest
+        return {
+            "count": self.count,
+            "price": latest["price"],
+            "streak": latest["streak"],
+            "moving_avg": latest["moving_avg"],
+            "buy_day": buy_day,
+            "sell_day": sell_day,
+            "profit": profit,
+            "last_extreme": latest["extreme"],
+        }
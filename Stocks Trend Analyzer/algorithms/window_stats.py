@@ -0,0 +1,135 @@
+import math
+import sys
+
+from dsa.ring_buffer import RingBuffer
+
+
+class ExponentialMovingAverage:
+    """EMA with smoothing 2 / (span + 1), seeded with the first price."""
+
+    def __init__(self, span):
+        if span < 1:
+            raise ValueError("Span must be positive")
+        self.alpha = 2 / (span + 1)
+        self.value = None
+
+    def update(self, price):
+        if self.value is None:
+            self.value = price
+        else:
+            self.value += self.alpha * (price - self.value)
+        return self.value
+
+    def calculate(self, prices):
+        self.value = None
+        return [self.update(price) for price in prices]
+
+
+class RollingStd:
+    """Standard deviation of the last `window` prices (fewer at the start).
+
+    Welford's update, extended to windows: when the buffer is full the
+    oldest price is swapped for the new one in a single O(1) step, which
+    stays accurate where sum / sum-of-squares formulas cancel badly.
+    Rounding still builds up, so m2 is recomputed from the buffer every
+    `window` steps, and whenever it is within its rounding error of zero
+    (a flat window then gives exactly 0).
+    """
+
+    # Relative rounding error of one update step, with some margin
+    EPS = 4 * sys.float_info.epsilon
+
+    def __init__(self, window, ddof=1):
+        self.window = RingBuffer(window)
+        self.ddof = ddof
+        self.mean = 0.0
+        self.m2 = 0.0   # sum of squared deviations from the mean
+        self.error = 0.0   # bound on the rounding error in m2
+        self.steps = 0     # updates since m2 was last recomputed
+
+    def update(self, price):
+        q = self.window
+        if q.is_full():
+            old = q.dequeue()
+            q.enqueue(price)
+            new_mean = self.mean + (price - old) / q.size()
+            self.error += self.EPS * (abs(self.m2) + abs(price - old) * (
+                abs(price) + abs(old) + abs(self.mean) + abs(new_mean)))
+            self.m2 += (price - old) * (price - new_mean + old - self.mean)
+            self.mean = new_mean
+        else:
+            q.enqueue(price)
+            delta = price - self.mean
+            self.mean += delta / q.size()
+            self.error += self.EPS * (abs(self.m2) + abs(delta) * (abs(price) + abs(self.mean)))
+            self.m2 += delta * (price - self.mean)
+        self.steps += 1
+        if self.m2 < self.error or self.steps >= q.capacity:
+            self._recompute()
+        return self.std()
+
+    def _recompute(self):
+        # Two passes over the buffer: O(window), so O(1) per update on average
+        q = self.window
+        self.mean = math.fsum(q) / q.size()
+        self.m2 = math.fsum((price - self.mean) ** 2 for price in q)
+        self.error = 0.0
+        self.steps = 0
+
+    def std(self):
+        n = self.window.size()
+        if n <= self.ddof:
+            return 0.0
+        return math.sqrt(max(self.m2, 0.0) / (n - self.ddof))
+
+    def calculate(self, prices):
+        self.__init__(self.window.capacity, self.ddof)
+        return [self.update(price) for price in prices]
+
+
+class MonotonicDeque:
+    """Window min (or max) in amortized O(1) per price.
+
+    Keeps (index, price) pairs whose prices only increase (for min) from
+    front to back; anything a newer price beats can never be the answer
+    again and is popped. The pairs live in a ring buffer of window size.
+    """
+
+    def __init__(self, window, keep="min"):
+        self.window = window
+        self.keep_min = keep == "min"
+        self.items = RingBuffer(window, track_sum=False)
+        self.index = -1
+
+    def update(self, price):
+        self.index += 1
+        items = self.items
+        # Drop the price that just left the window first, so the buffer never overflows
+        if not items.is_empty() and items.front()[0] <= self.index - self.window:
+            items.dequeue()
+        while not items.is_empty() and (
+                items.back()[1] >= price if self.keep_min else items.back()[1] <= price):
+            items.pop()
+        items.enqueue((self.index, price))
+        return items.front()[1]
+
+
+class RollingMinMax:
+    """Lowest and highest of the last `window` prices."""
+
+    def __init__(self, window):
+        self.window = window
+        self.lows = MonotonicDeque(window, "min")
+        self.highs = MonotonicDeque(window, "max")
+
+    def update(self, price):
+        return self.lows.update(price), self.highs.update(price)
+
+    def calculate(self, prices):
+        self.__init__(self.window)
+        lows, highs = [], []
+        for price in prices:
+            low, high = self.update(price)
+            lows.append(low)
+            highs.append(high)
+        return lows, highs
@@ -0,0 +1,186 @@
+"""Headless batch analysis of many price CSVs.
+
+Runs the same analyses as the GUI on every file, one symbol per file, on a
+process pool, and writes one summary row per symbol as it finishes:
+
+    python batch.py data/ --out summary.csv
+    python batch.py "prices/*.csv" --workers 8 --format jsonl --out summary.jsonl
+
+Throughput is printed to stderr at the end.
+"""
+import argparse
+import csv
+import glob
+import json
+import math
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from dsa.array_list import ArrayList
+from loaders.price_cache import load_cached
+from algorithms.trend_analysis import TrendAnalysis
+from algorithms.moving_average import MovingAverage
+from algorithms.max_profit import MaxProfit
+from algorithms.local_high_low import LocalHighLow
+from algorithms.numpy_engine import NumpyEngine, AVAILABLE as NUMPY_AVAILABLE
+
+FIELDS = ["symbol", "rows", "first_date", "last_date", "last_price", "moving_avg",
+          "latest_streak", "buy_day", "buy_date", "sell_day", "sell_date", "profit",
+          "highs", "lows", "seconds", "error"]
+
+
+def find_files(inputs):
+    """CSV paths from directories, globs and plain file names, sorted and unique."""
+    paths = set()
+    for item in inputs:
+        if os.path.isdir(item):
+            paths.update(glob.glob(os.path.join(item, "*.csv")))
+        elif glob.has_magic(item):
+            paths.update(glob.glob(item))
+        else:
+            paths.add(item)
+    return sorted(paths)
+
+
+def analyze_file(path, window=5, engine="python", use_cache=True):
+    """Summary dict for one CSV; failures are reported in "error", not raised."""
+    start = time.perf_counter()
+    summary = dict.fromkeys(FIELDS)
+    summary["symbol"] = os.path.splitext(os.path.basename(path))[0]
+    try:
+        series = load_cached(path, use_cache=use_cache)
+        prices = list(series.prices())
+        if engine == "numpy":
+            numpy_engine = NumpyEngine(prices)
+            trends = numpy_engine.detect_trends()
+            moving_avg = numpy_engine.moving_average(window)
+            buy_day, sell_day, profit = numpy_engine.best_interval()
+            extremes = numpy_engine.find_local_extremes()
+        else:
+            price_list = ArrayList()
+            price_list.extend(prices)
+            trends = TrendAnalysis(price_list).detect_trends().data
+            moving_avg = MovingAverage(window).calculate(prices)
+            buy_day, sell_day, profit = MaxProfit(prices).best_interval()
+            extremes = LocalHighLow(prices).find_local_extremes()
+
+        n = len(prices)
+        summary.update(
+            rows=n,
+            first_date=series.dates[0] if n else None,
+            last_date=series.dates[n - 1] if n else None,
+            last_price=prices[-1] if n else None,
+            moving_avg=float(moving_avg[-1]) if n else None,
+            latest_streak=int(trends[-1]) if len(trends) else None,
+            buy_day=buy_day,
+            buy_date=series.dates[buy_day] if buy_day is not None else None,
+            sell_day=sell_day,
+            sell_date=series.dates[sell_day] if sell_day is not None else None,
+            profit=profit,
+            highs=sum(1 for _, kind, _ in extremes if kind == "High"),
+            lows=sum(1 for _, kind, _ in extremes if kind == "Low"),
+        )
+    except Exception as e:
+        summary["error"] = f"{type(e).__name__}: {e}"
+    summary["seconds"] = time.perf_counter() - start
+    return summary
+
+
+def _analyze_args(args):
+    return analyze_file(*args)
+
+
+def _analyze_chunk(jobs):
+    return [analyze_file(*args) for args in jobs]
+
+
+class SummaryWriter:
+    """Writes summaries as CSV rows or JSON lines, flushing each one."""
+
+    def __init__(self, out, fmt):
+        self.out = out
+        self.fmt = fmt
+        if fmt == "csv":
+            self.writer = csv.DictWriter(out, fieldnames=FIELDS)
+            self.writer.writeheader()
+
+    def write(self, summary):
+        if self.fmt == "csv":
+            self.writer.writerow(summary)
+        else:
+            # NaN is not valid JSON
+            clean = {k: None if isinstance(v, float) and math.isnan(v) else v
+                     for k, v in summary.items()}
+            self.out.write(json.dumps(clean) + "\n")
+        self.out.flush()
+
+
+def run(paths, out, fmt="csv", window=5, engine="python", workers=None, use_cache=True):
+    """Analyze paths and stream summaries to out. Returns throughput stats."""
+    writer = SummaryWriter(out, fmt)
+    jobs = [(path, window, engine, use_cache) for path in paths]
+    stats = {"files": 0, "failed": 0, "rows": 0}
+    start = time.perf_counter()
+    if workers == 1 or len(jobs) <= 1:
+        results = ([summary] for summary in map(_analyze_args, jobs))
+        executor = None
+    else:
+        executor = ProcessPoolExecutor(max_workers=workers)
+        # Several files per task: per-task overhead dominates for small CSVs
+        chunksize = max(1, len(jobs) // ((workers or os.cpu_count() or 1) * 8))
+        futures = [executor.submit(_analyze_chunk, jobs[i:i + chunksize])
+                   for i in range(0, len(jobs), chunksize)]
+        # Rows come out in the order tasks finish, so one slow file does
+        # not hold back the ones after it (sort the output if order matters)
+        results = (future.result() for future in as_completed(futures))
+    try:
+        for summaries in results:
+            for summary in summaries:
+                writer.write(summary)
+                stats["files"] += 1
+                stats["failed"] += summary["error"] is not None
+                stats["rows"] += summary["rows"] or 0
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    seconds = time.perf_counter() - start
+    stats["seconds"] = seconds
+    stats["files_per_s"] = stats["files"] / seconds if seconds else 0.0
+    stats["rows_per_s"] = stats["rows"] / seconds if seconds else 0.0
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Analyze many price CSVs without the GUI.")
+    parser.add_argument("inputs", nargs="+", help="CSV files, directories or glob patterns")
+    parser.add_argument("--window", type=int, default=5, help="moving average window")
+    parser.add_argument("--engine", choices=("python", "numpy"),
+                        default="numpy" if NUMPY_AVAILABLE else "python")
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: CPU count)")
+    parser.add_argument("--format", choices=("csv", "jsonl"), help="output format (default: from --out)")
+    parser.add_argument("--out", help="output file (default: stdout)")
+    parser.add_argument("--no-cache", action="store_true", help="don't read or write binary caches")
+    args = parser.parse_args(argv)
+    if args.window < 1:
+        parser.error("--window must be positive")
+
+    paths = find_files(args.inputs)
+    if not paths:
+        parser.error("no CSV files found")
+    fmt = args.format or ("jsonl" if args.out and args.out.endswith((".json", ".jsonl")) else "csv")
+
+    out = open(args.out, "w", newline="", encoding="utf-8") if args.out else sys.stdout
+    try:
+        stats = run(paths, out, fmt, args.window, args.engine, args.workers, not args.no_cache)
+    finally:
+        if args.out:
+            out.close()
+    print(f"{stats['files']} files ({stats['failed']} failed), {stats['rows']:,} rows "
+          f"in {stats['seconds']:.2f}s: {stats['files_per_s']:,.1f} files/s, "
+          f"{stats['rows_per_s']:,.0f} rows/s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
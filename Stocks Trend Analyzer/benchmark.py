@@ -0,0 +1,153 @@
+"""Times every analysis in algorithms/ on synthetic prices of growing size.
+
+For each algorithm and size the best of --repeat runs is kept; the table on
+stderr shows nanoseconds per price and the scaling exponent (1.0 = linear,
+2.0 = quadratic) fitted between the smallest and largest size. Full results
+are printed as JSON:
+
+    python benchmark.py --sizes 1000 10000 100000 1000000 --out bench.json
+    python benchmark.py --only numpy
+"""
+import argparse
+import json
+import math
+import platform
+import random
+import sys
+import time
+
+from dsa.array_list import ArrayList
+from algorithms.trend_analysis import TrendAnalysis
+from algorithms.moving_average import MovingAverage
+from algorithms.max_profit import MaxProfit
+from algorithms.local_high_low import LocalHighLow
+from algorithms.window_stats import ExponentialMovingAverage, RollingStd, RollingMinMax
+from algorithms.streaming import StreamingAnalyzer
+from algorithms.profit_queries import RangeProfit, max_profit_k
+from algorithms.downsample import downsample
+from algorithms.numpy_engine import NumpyEngine, AVAILABLE as NUMPY_AVAILABLE
+
+try:
+    from data.random_csv_genrator import generate
+except ImportError:   # the generator needs NumPy
+    generate = None
+
+WINDOW = 20
+RANGE_QUERIES = 1000
+
+
+def make_prices(n, seed):
+    if generate is not None:
+        _, columns = generate(n, seed, regimes=("calm", "bull", "bear", "volatile"))
+        return columns["Close"].tolist()
+    rng = random.Random(seed)
+    prices = [100.0]
+    for _ in range(n - 1):
+        prices.append(round(prices[-1] * math.exp(rng.gauss(0, 0.02)), 2))
+    return prices
+
+
+def cases(prices):
+    """name -> zero-argument function running one analysis on prices."""
+    array_list = ArrayList()
+    array_list.extend(prices)
+    rng = random.Random(0)
+    n = len(prices)
+    ranges = [sorted((rng.randrange(n), rng.randrange(n))) for _ in range(RANGE_QUERIES)]
+    range_profit = RangeProfit(prices)
+
+    found = {
+        "trend_analysis": lambda: TrendAnalysis(array_list).detect_trends(),
+        "moving_average": lambda: MovingAverage(WINDOW).calculate(prices),
+        "max_profit": lambda: MaxProfit(prices).best_interval(),
+        "local_extremes": lambda: LocalHighLow(prices).find_local_extremes(),
+        "swing_points": lambda: LocalHighLow(prices).find_swing_points(WINDOW, 1.0),
+        "ema": lambda: ExponentialMovingAverage(WINDOW).calculate(prices),
+        "rolling_std": lambda: RollingStd(WINDOW).calculate(prices),
+        "rolling_min_max": lambda: RollingMinMax(WINDOW).calculate(prices),
+        "streaming_analyzer": lambda: StreamingAnalyzer(WINDOW).extend(prices),
+        "range_profit_build": lambda: RangeProfit(prices),
+        f"range_profit_{RANGE_QUERIES}_queries": lambda: [range_profit.best_interval(a, b) for a, b in ranges],
+        "max_profit_k3": lambda: max_profit_k(prices, 3),
+        "downsample_2000": lambda: downsample(prices, 2000),
+    }
+    if NUMPY_AVAILABLE:
+        engine = NumpyEngine(prices)
+        found.update({
+            "numpy_trends": engine.detect_trends,
+            "numpy_moving_average": lambda: engine.moving_average(WINDOW),
+            "numpy_max_profit": engine.best_interval,
+            "numpy_local_extremes": engine.find_local_extremes,
+        })
+    return found
+
+
+def best_time(run, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run(args):
+    results = {}
+    for n in args.sizes:
+        prices = make_prices(n, args.seed)
+        for name, case in cases(prices).items():
+            if args.only and not any(part in name for part in args.only):
+                continue
+            seconds = best_time(case, args.repeat)
+            results.setdefault(name, []).append(
+                {"n": n, "seconds": seconds, "ns_per_price": seconds / n * 1e9})
+            print(f"  {name:<28} n={n:<10,} {seconds * 1e3:10.2f} ms", file=sys.stderr)
+
+    for name, points in results.items():
+        first, last = points[0], points[-1]
+        exponent = None
+        if last["n"] > first["n"] and first["seconds"] > 0 and last["seconds"] > 0:
+            exponent = math.log(last["seconds"] / first["seconds"]) / math.log(last["n"] / first["n"])
+        results[name] = {"points": points, "scaling_exponent": exponent}
+    return {
+        "python": platform.python_version(),
+        "numpy": NUMPY_AVAILABLE,
+        "params": {"sizes": args.sizes, "repeat": args.repeat, "seed": args.seed, "window": WINDOW},
+        "algorithms": results,
+    }
+
+
+def print_table(result):
+    sizes = result["params"]["sizes"]
+    header = f"{'algorithm':<28}" + "".join(f"{f'ns/price n={n:,}':>20}" for n in sizes) + f"{'scaling':>10}"
+    print("\n" + header, file=sys.stderr)
+    for name, data in result["algorithms"].items():
+        cells = {p["n"]: p["ns_per_price"] for p in data["points"]}
+        row = f"{name:<28}" + "".join(f"{cells.get(n, float('nan')):>20,.1f}" for n in sizes)
+        exponent = data["scaling_exponent"]
+        row += f"{exponent:>10.2f}" if exponent is not None else f"{'-':>10}"
+        print(row, file=sys.stderr)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the price analyses across input sizes.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000],
+                        help="numbers of prices to time")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per case (best is kept)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--only", nargs="+", help="only algorithms whose name contains one of these")
+    parser.add_argument("--out", help="write the JSON results to this file")
+    args = parser.parse_args(argv)
+    args.sizes = sorted(set(args.sizes))
+
+    result = run(args)
+    print_table(result)
+    text = json.dumps(result, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
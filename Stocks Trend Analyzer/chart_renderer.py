@@ -0,0 +1,109 @@
+import numpy as np  # always there with matplotlib
+
+from algorithms.downsample import downsample
+
+
+class ChartRenderer:
+    """Draws the analysis chart and updates it in place on re-analysis.
+
+    The artists (two lines, buy/sell markers, one scatter per extremum kind)
+    are created once; later renders only swap their data. Lines are
+    downsampled to about two points per pixel of the visible x range, extremum
+    markers thinned to one per pixel column, and both redone when the user
+    zooms or pans.
+    """
+
+    POINTS_PER_PIXEL = 2
+
+    def __init__(self, ax, canvas):
+        self.ax = ax
+        self.canvas = canvas
+        self.prices = []
+        self.moving_avg = []
+        self.markers = {}
+        self.artists = None
+        self._updating = False
+
+    def _create_artists(self):
+        ax = self.ax
+        ax.clear()
+        price_line, = ax.plot([], [], label="Close Price")
+        ma_line, = ax.plot([], [], label="Moving Average")
+        self.artists = {
+            "price": price_line,
+            "ma": ma_line,
+            "buy": ax.scatter([], [], color="green", marker="^", s=100),
+            "sell": ax.scatter([], [], color="red", marker="v", s=100),
+            "High": ax.scatter([], [], color="purple"),
+            "Low": ax.scatter([], [], color="brown"),
+        }
+        ax.set_title("Stock Trend Analysis")
+        # Registered after clear(), which resets the axes callbacks
+        ax.callbacks.connect("xlim_changed", self._on_xlim_changed)
+
+    def render(self, prices, moving_avg, window, buy_day, sell_day, extremes):
+        if self.artists is None:
+            self._create_artists()
+        self.prices = prices
+        self.moving_avg = moving_avg
+        artists = self.artists
+        artists["ma"].set_label(f"{window}-Day MA")
+
+        markers = {"High": [], "Low": []}
+        for idx, kind, price in extremes:
+            markers[kind].append((idx, price))
+        self.markers = {kind: np.array(points, dtype=np.float64).reshape(-1, 2)
+                        for kind, points in markers.items()}
+        artists["buy"].set_offsets([(buy_day, prices[buy_day])])
+        artists["sell"].set_offsets([(sell_day, prices[sell_day])])
+
+        # Full x range first, then the lines for that range
+        self._updating = True
+        try:
+            self.ax.set_xlim(0, max(len(prices) - 1, 1))
+            values = np.asarray(prices, dtype=np.float64)
+            if np.isfinite(values).any():
+                low, high = np.nanmin(values), np.nanmax(values)
+                pad = (high - low) * 0.05 or 1
+                self.ax.set_ylim(low - pad, high + pad)
+        finally:
+            self._updating = False
+        self._update_visible()
+        self.ax.legend()
+        self.canvas.draw_idle()
+
+    def _update_visible(self):
+        n = len(self.prices)
+        if not n:
+            return
+        left, right = self.ax.get_xlim()
+        start = max(int(left), 0)
+        end = min(int(right) + 2, n)
+        if start >= end:
+            start, end = 0, n
+        pixels = max(int(self.ax.bbox.width), 1)
+        n_out = max(pixels * self.POINTS_PER_PIXEL, 3)
+        for name, values in (("price", self.prices), ("ma", self.moving_avg)):
+            picked = downsample(values, n_out, start, end)
+            self.artists[name].set_data(picked, [values[i] for i in picked])
+        for kind, points in self.markers.items():
+            self.artists[kind].set_offsets(self._thin_markers(points, kind, start, end, pixels))
+
+    @staticmethod
+    def _thin_markers(points, kind, start, end, pixels):
+        # Markers in the same pixel column overlap: keep only the highest High
+        # (lowest Low) of each column, drawing is per marker
+        visible = points[(points[:, 0] >= start) & (points[:, 0] < end)]
+        if len(visible) <= pixels:
+            return visible
+        column = ((visible[:, 0] - start) * pixels // (end - start)).astype(np.int64)
+        price = -visible[:, 1] if kind == "High" else visible[:, 1]
+        order = np.lexsort((price, column))
+        _, first = np.unique(column[order], return_index=True)
+        return visible[order[first]]
+
+    def _on_xlim_changed(self, ax):
+        if self._updating or self.artists is None:
+            return
+        self._update_visible()
+        self.canvas.draw_idle()
@@ -1,31 +1,157 @@
-import csv
-import random
-from datetime import datetime, timedelta
+"""Synthetic OHLCV data for trying out and benchmarking the analyzer.
+
+With no arguments it writes 30 days of random-walk prices to
+data/sample_stock.csv, as before. For benchmarks:
+
+    python data/random_csv_genrator.py --rows 5000000 --seed 1 --out big.csv
+    python data/random_csv_genrator.py --rows 100000 --symbols 50 --out prices/
+    python data/random_csv_genrator.py --rows 1000000 --regimes bull,bear,volatile --format cache
+
+Each day opens near the previous close, high and low spread around the
+open, and the close falls between them, all in log-price space so long
+series never go negative. Regimes switch the drift and volatility for
+stretches of the series. Whole series are generated as NumPy arrays.
+"""
+import argparse
 import os
+import sys
 
-# Current folder (run from inside data/)
+import numpy as np
+
+# Run from anywhere: the loaders package is one folder up
 current_dir = os.path.abspath(os.path.dirname(__file__))
+sys.path.insert(0, os.path.dirname(current_dir))
+
+from loaders.csv_loader import COLUMNS, PriceSeries   # noqa: E402
+
+# name -> (daily drift of log price, volatility multiplier)
+REGIMES = {
+    "calm": (0.0, 1.0),
+    "bull": (0.004, 1.0),
+    "bear": (-0.004, 1.2),
+    "sideways": (0.0, 0.5),
+    "volatile": (0.0, 3.0),
+}
+
+FREQUENCIES = {"day": "D", "minute": "m"}
+
+
+def generate(rows, seed=None, regimes=("calm",), regime_length=250, start_price=100.0,
+             gap=0.02, spread=0.05, band=10.0, start_date="2025-01-01", freq="day"):
+    """(dates, {column: float64 array}) for one synthetic symbol.
+
+    gap is the largest open-vs-previous-close move and spread the largest
+    high/low distance from the open, both as fractions of the price. The
+    close is reflected back whenever it leaves start_price / band ..
+    start_price * band, so million-row series stay in a realistic range.
+    """
+    rng = np.random.default_rng(seed)
+    # Regime of every row: stretches of random (geometric) length
+    lengths = rng.geometric(1 / max(regime_length, 1), size=rows // max(regime_length, 1) * 4 + 4)
+    starts = np.cumsum(lengths)
+    segment = np.searchsorted(starts, np.arange(rows), side="right")
+    choices = rng.integers(0, len(regimes), size=len(starts) + 1)
+    drift = np.array([REGIMES[r][0] for r in regimes])[choices][segment]
+    vol = np.array([REGIMES[r][1] for r in regimes])[choices][segment]
+
+    open_gap = rng.uniform(-gap, gap, rows) * vol
+    up = rng.uniform(0, spread, rows) * vol
+    down = rng.uniform(0, spread, rows) * vol
+    close_at = rng.uniform(0, 1, rows)
+    # Log close = running sum of (gap to the open + move from open to close)
+    close_move = -down + close_at * (up + down)
+    walk = np.cumsum(open_gap + close_move + drift)
+    # Reflect into [-limit, limit]: a triangle wave of the walk
+    limit = np.log(band)
+    walk = limit - np.abs(np.mod(walk + limit, 4 * limit) - 2 * limit)
+    log_close = np.log(start_price) + walk
+    log_open = log_close - close_move
+
+    columns = {
+        "Open": np.round(np.exp(log_open), 2),
+        "High": np.round(np.exp(log_open + up), 2),
+        "Low": np.round(np.exp(log_open - down), 2),
+        "Close": np.round(np.exp(log_close), 2),
+        "Volume": rng.integers(5000, 20001, rows) * np.maximum(vol, 1).round(),
+    }
+    unit = FREQUENCIES[freq]
+    first = np.datetime64(start_date, unit)
+    dates = np.datetime_as_string(first + np.arange(rows).astype(f"timedelta64[{unit}]"))
+    if freq == "minute":
+        dates = np.char.replace(dates, "T", " ")
+    return dates, columns
+
+
+def write_csv(path, dates, columns, chunk_rows=200000):
+    with open(path, "w", newline="") as f:
+        f.write("Date,Open,High,Low,Close,Volume\n")
+        for start in range(0, len(dates), chunk_rows):
+            end = start + chunk_rows
+            rows = zip(dates[start:end].tolist(),
+                       *(columns[name][start:end].tolist() for name in COLUMNS))
+            f.write("".join(f"{d},{o:.2f},{h:.2f},{lo:.2f},{c:.2f},{v:.0f}\n"
+                            for d, o, h, lo, c, v in rows))
+
+
+def write_output(path, fmt, dates, columns):
+    """Write one symbol: csv, csv plus its binary cache, or a NumPy .npz."""
+    if fmt == "npz":
+        np.savez(path, Date=dates, **columns)
+        return
+    write_csv(path, dates, columns)
+    if fmt == "cache":
+        # Same binary cache the app would build on first load, without re-parsing
+        from loaders.price_cache import cache_path, write_cache
+        series = PriceSeries()
+        series.dates = dates.tolist()
+        for name in COLUMNS:
+            series.columns[name] = columns[name].astype(np.float64)
+        write_cache(series, cache_path(path), os.stat(path))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate synthetic OHLCV price files.")
+    parser.add_argument("--rows", type=int, default=30, help="rows per symbol")
+    parser.add_argument("--symbols", type=int, default=1, help="number of files to write")
+    parser.add_argument("--seed", type=int, default=None, help="random seed (default: random)")
+    parser.add_argument("--regimes", default="calm",
+                        help=f"comma-separated regimes to switch between: {', '.join(REGIMES)}")
+    parser.add_argument("--regime-length", type=int, default=250, help="average rows per regime")
+    parser.add_argument("--start-price", type=float, default=100.0)
+    parser.add_argument("--band", type=float, default=10.0,
+                        help="prices stay within start price divided / multiplied by this")
+    parser.add_argument("--freq", choices=sorted(FREQUENCIES), default="day", help="time between rows")
+    parser.add_argument("--format", choices=("csv", "cache", "npz"), default="csv",
+                        help="cache = CSV plus its binary cache; npz = NumPy columns")
+    parser.add_argument("--out", help="output file, or folder when --symbols > 1 "
+                                      "(default: data/sample_stock.csv)")
+    args = parser.parse_args(argv)
+
+    regimes = [r.strip() for r in args.regimes.split(",") if r.strip()]
+    unknown = [r for r in regimes if r not in REGIMES]
+    if unknown or not regimes:
+        parser.error(f"unknown regime(s): {', '.join(unknown)}")
+    if args.band <= 1:
+        parser.error("--band must be greater than 1")
+    ext = ".npz" if args.format == "npz" else ".csv"
+    if args.symbols == 1:
+        paths = [args.out or os.path.join(current_dir, "sample_stock" + ext)]
+    else:
+        folder = args.out or current_dir
+        os.makedirs(folder, exist_ok=True)
+        paths = [os.path.join(folder, f"SYM{i:04d}{ext}") for i in range(1, args.symbols + 1)]
+
+    seeds = np.random.SeedSequence(args.seed).spawn(len(paths))
+    for path, seed in zip(paths, seeds):
+        dates, columns = generate(args.rows, seed, regimes, args.regime_length,
+                                  args.start_price, band=args.band, freq=args.freq)
+        write_output(path, args.format, dates, columns)
+
+    if len(paths) == 1:
+        print(f"Sample CSV generated at: {paths[0]}")
+    else:
+        print(f"{len(paths)} files of {args.rows} rows generated in: {os.path.dirname(paths[0])}")
+
 
-# CSV file path (directly in current folder)
-file_path = os.path.join(current_dir, "sample_stock.csv")
-
-# Create CSV with headers
-with open(file_path, "w", newline='') as file:
-    writer = csv.writer(file)
-    writer.writerow(["Date", "Open", "High", "Low", "Close", "Volume"])
-    
-    # Generate 30 days of stock data
-    date = datetime(2025, 1, 1)
-    price = 100  # starting price
-    for _ in range(30):
-        open_price = round(price + random.uniform(-2, 2), 2)
-        high = round(open_price + random.uniform(0, 5), 2)
-        low = round(open_price - random.uniform(0, 5), 2)
-        close = round(random.uniform(low, high), 2)
-        volume = random.randint(5000, 20000)
-        writer.writerow([date.strftime("%Y-%m-%d"), open_price, high, low, close, volume])
-        
-        date += timedelta(days=1)
-        price = close
-
-print(f"Sample CSV generated at: {file_path}")
+if __name__ == "__main__":
+    main()
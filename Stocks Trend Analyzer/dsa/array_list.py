@@ -1,9 +1,20 @@
 class ArrayList:
-    def __init__(self):
-        self.data = []
-    
+    def __init__(self, data=None):
+        # data: any sequence (e.g. a memory-mapped column), used without
+        # copying; it is only copied into a list on the first write
+        self.data = [] if data is None else data
+
+    def _writable(self):
+        if not isinstance(self.data, list):
+            self.data = list(self.data)
+
     def append(self, value):
-        self.data += [value]
+        self._writable()
+        self.data.append(value)
+
+    def extend(self, values):
+        self._writable()
+        self.data.extend(values)
     
     def get(self, index):
         if 0 <= index < len(self.data):
@@ -14,7 +25,7 @@ class ArrayList:
         return len(self.data)
     
     def __str__(self):
-        return str(self.data)
+        return str(list(self.data))
     
     def clear(self):
         self.data = []
@@ -0,0 +1,105 @@
+class RingBuffer:
+    """Fixed-capacity queue on a circular array.
+
+    Enqueue and dequeue are O(1): items never move, only the head index does.
+    The running sum uses Neumaier (compensated) summation, so the average
+    does not drift after millions of adds and removes. Pass track_sum=False
+    to store non-numeric items.
+    """
+
+    def __init__(self, capacity, track_sum=True):
+        if capacity < 1:
+            raise ValueError("Capacity must be positive")
+        self.items = [None] * capacity
+        self.capacity = capacity
+        self.head = 0    # index of the oldest item
+        self.count = 0
+        self.track_sum = track_sum
+        self._sum = 0.0
+        self._compensation = 0.0
+
+    def _add_to_sum(self, value):
+        if not self.track_sum:
+            return
+        total = self._sum + value
+        if abs(self._sum) >= abs(value):
+            self._compensation += (self._sum - total) + value
+        else:
+            self._compensation += (value - total) + self._sum
+        self._sum = total
+
+    def _remove_from_sum(self, value):
+        if self.count == 0:
+            # Start the next window from an exact zero
+            self._sum = self._compensation = 0.0
+        elif self.track_sum:
+            self._add_to_sum(-value)
+
+    def enqueue(self, value):
+        if self.count == self.capacity:
+            raise IndexError("Queue is full")
+        self.items[(self.head + self.count) % self.capacity] = value
+        self.count += 1
+        self._add_to_sum(value)
+
+    def dequeue(self):
+        if self.count == 0:
+            raise IndexError("Queue is empty")
+        removed = self.items[self.head]
+        self.items[self.head] = None
+        self.head = (self.head + 1) % self.capacity
+        self.count -= 1
+        self._remove_from_sum(removed)
+        return removed
+
+    def pop(self):
+        # Remove the newest item (lets the buffer back a deque)
+        if self.count == 0:
+            raise IndexError("Queue is empty")
+        self.count -= 1
+        i = (self.head + self.count) % self.capacity
+        removed = self.items[i]
+        self.items[i] = None
+        self._remove_from_sum(removed)
+        return removed
+
+    def front(self):
+        if self.count == 0:
+            return None
+        return self.items[self.head]
+
+    def back(self):
+        if self.count == 0:
+            return None
+        return self.items[(self.head + self.count - 1) % self.capacity]
+
+    def get(self, index):
+        # index 0 is the oldest item
+        if 0 <= index < self.count:
+            return self.items[(self.head + index) % self.capacity]
+        raise IndexError("Index out of bounds")
+
+    @property
+    def sum(self):
+        return self._sum + self._compensation
+
+    def size(self):
+        return self.count
+
+    def average(self):
+        if self.count:
+            return self.sum / self.count
+        return 0
+
+    def is_empty(self):
+        return self.count == 0
+
+    def is_full(self):
+        return self.count == self.capacity
+
+    def __iter__(self):
+        for i in range(self.count):
+            yield self.items[(self.head + i) % self.capacity]
+
+    def __str__(self):
+        return str(list(self))
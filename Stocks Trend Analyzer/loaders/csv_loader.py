@@ -0,0 +1,202 @@
+import csv
+import os
+import re
+import time
+from array import array
+
+COLUMNS = ("Open", "High", "Low", "Close", "Volume")
+
+# Other header names used by common exports (e.g. Investing.com)
+ALIASES = {"price": "Close", "vol": "Volume", "vol.": "Volume"}
+
+SUFFIXES = {"K": 1e3, "M": 1e6, "B": 1e9, "T": 1e12}
+
+# "88,154.4" written without quotes splits into "88" and "154.4": a 1-3 digit
+# token followed by tokens of exactly three digits is one number
+_LEAD = re.compile(r"[-+]?\d{1,3}$")
+_GROUP = re.compile(r"\d{3}$")
+_LAST_GROUP = re.compile(r"\d{3}(\.\d*)?[KMBT%]?$", re.IGNORECASE)
+
+NAN = float("nan")
+
+
+def parse_number(text):
+    """float of text, accepting "1,234.5", "61.65B", "3.2%"; NaN if empty or bad."""
+    try:
+        return float(text)
+    except ValueError:
+        pass
+    text = text.strip().replace(",", "").rstrip("%")
+    if not text:
+        return NAN
+    scale = SUFFIXES.get(text[-1].upper())
+    if scale is not None:
+        text = text[:-1]
+    try:
+        return float(text) * (scale or 1)
+    except ValueError:
+        return NAN
+
+
+def join_thousands(tokens):
+    """Merge tokens that were one number split at its thousands separators."""
+    values = []
+    i = 0
+    while i < len(tokens):
+        token = tokens[i]
+        i += 1
+        if _LEAD.match(token):
+            while i < len(tokens) and _LAST_GROUP.match(tokens[i]):
+                token += tokens[i]
+                i += 1
+                if not _GROUP.match(tokens[i - 1]):
+                    break   # decimals or a suffix end the number
+        values.append(token)
+    return values
+
+
+class PriceSeries:
+    """Loaded price history: dates plus one typed array per OHLCV column.
+
+    Columns missing from the file, or values that can't be parsed, are NaN.
+    load_csv drops the rows without a price, so the analyses never see NaN.
+    """
+
+    def __init__(self):
+        self.dates = []
+        self.columns = {name: array("d") for name in COLUMNS}
+        self.stats = {"rows": 0, "seconds": 0.0, "rows_per_s": 0.0, "short_rows": 0,
+                      "dropped_rows": 0}
+
+    def size(self):
+        return len(self.dates)
+
+    def __getattr__(self, name):
+        # series.close, series.open, ...
+        column = name.capitalize()
+        if column in COLUMNS:
+            return self.columns[column]
+        raise AttributeError(name)
+
+    def prices(self):
+        """Close prices, or Open when the file has no Close values."""
+        close = self.columns["Close"]
+        if any(x == x for x in close):   # x == x is False only for NaN
+            return close
+        return self.columns["Open"]
+
+    def drop_missing(self):
+        """Remove the rows whose price (see prices()) is NaN; returns how many."""
+        prices = self.prices()
+        keep = [i for i, x in enumerate(prices) if x == x]
+        if len(keep) == len(prices):
+            return 0
+        self.dates = [self.dates[i] for i in keep]
+        for name in COLUMNS:
+            column = self.columns[name]
+            self.columns[name] = array("d", (column[i] for i in keep))
+        return len(prices) - len(keep)
+
+    def extend(self, other):
+        self.dates.extend(other.dates)
+        for name in COLUMNS:
+            self.columns[name].extend(other.columns[name])
+
+
+def _header_fields(header):
+    """(index of the date column, [column name or None for each field])."""
+    names = []
+    for field in header:
+        key = field.strip().lower()
+        names.append(ALIASES.get(key) or next((c for c in COLUMNS if c.lower() == key), None))
+    keys = [field.strip().lower() for field in header]
+    date_index = keys.index("date") if "date" in keys else 0
+    names[date_index] = None
+    return date_index, names
+
+
+def _irregular_row(row, date_index, n_values):
+    """(values after the date, whether the row was short) for a row that
+    doesn't have one token per column."""
+    tokens = row[:date_index] + row[date_index + 1:]
+    if len(tokens) > n_values:
+        tokens = join_thousands(tokens)
+    fields = [parse_number(t) for t in tokens]
+    short = len(fields) < n_values
+    if short and fields:
+        # First values left to right, the last one (Volume, in the exports
+        # seen so far) to the last column
+        fields = fields[:-1] + [NAN] * (n_values - len(fields)) + fields[-1:]
+    return fields + [NAN] * (n_values - len(fields)), short
+
+
+def iter_chunks(path, chunk_rows=100000, encoding="utf-8-sig"):
+    """Yield PriceSeries of up to chunk_rows rows, so files larger than RAM
+    can be processed piece by piece. Each chunk's stats cover that chunk."""
+    with open(path, "r", encoding=encoding, newline="") as f:
+        reader = csv.reader(f)
+        header = next(reader, [])
+        if not header:
+            return
+        date_index, names = _header_fields(header)
+        expected = len(header)
+        n_values = expected - 1
+        # Where each known column sits in the row, and in the values after the date
+        positions = [i for i, name in enumerate(names) if name]
+        value_index = [i if i < date_index else i - 1 for i in positions]
+        present = [names[i] for i in positions]
+        absent = [c for c in COLUMNS if c not in present]
+
+        chunk = None
+        for row in reader:
+            if chunk is None:
+                chunk = PriceSeries()
+                appends = [chunk.columns[name].append for name in present]
+                absent_appends = [chunk.columns[name].append for name in absent]
+                add_date = chunk.dates.append
+                start = time.perf_counter()
+            if not row:
+                continue
+            if len(row) == expected:
+                try:
+                    values = [float(row[i]) for i in positions]
+                except ValueError:
+                    values = [parse_number(row[i]) for i in positions]
+            else:
+                fields, short = _irregular_row(row, date_index, n_values)
+                chunk.stats["short_rows"] += short
+                values = [fields[i] for i in value_index]
+            add_date(row[date_index] if date_index < len(row) else "")
+            for append, value in zip(appends, values):
+                append(value)
+            for append in absent_appends:
+                append(NAN)
+            if len(chunk.dates) >= chunk_rows:
+                yield _finish(chunk, start)
+                chunk = None
+        if chunk is not None and chunk.dates:
+            yield _finish(chunk, start)
+
+
+def _finish(chunk, start):
+    seconds = time.perf_counter() - start
+    chunk.stats["rows"] = len(chunk.dates)
+    chunk.stats["seconds"] = seconds
+    chunk.stats["rows_per_s"] = chunk.stats["rows"] / seconds if seconds else 0.0
+    return chunk
+
+
+def load_csv(path, encoding="utf-8-sig"):
+    """Read the whole file into one PriceSeries; stats["rows_per_s"] is the parse speed."""
+    series = PriceSeries()
+    start = time.perf_counter()
+    for chunk in iter_chunks(path, encoding=encoding):
+        series.extend(chunk)
+        series.stats["short_rows"] += chunk.stats["short_rows"]
+    # NaN compares false both ways, which the Python classes and NumPy turn
+    # into different streaks and extremes: drop those rows once, here
+    series.stats["dropped_rows"] = series.drop_missing()
+    seconds = time.perf_counter() - start
+    series.stats.update(rows=series.size(), bytes=os.path.getsize(path), seconds=seconds,
+                        rows_per_s=series.size() / seconds if seconds else 0.0)
+    return series
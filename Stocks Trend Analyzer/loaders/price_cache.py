@@ -0,0 +1,137 @@
+import mmap
+import os
+import struct
+import sys
+import time
+from array import array
+
+from loaders.csv_loader import COLUMNS, PriceSeries, load_csv
+
+# File layout (native byte order, recorded in the header):
+#   header | padding to 8 bytes | one float64 column per COLUMNS entry
+#   | rows + 1 uint64 date offsets | UTF-8 date bytes
+MAGIC = b"PRCC"
+VERSION = 2   # 2: rows without a price are dropped before caching
+_HEADER = struct.Struct("<4sHH qq QQ")   # magic, version, byte order, size, mtime_ns, rows, date bytes
+_LITTLE = 1 if sys.byteorder == "little" else 0
+
+
+def cache_path(path):
+    return path + ".cache"
+
+
+def _align(n):
+    return (n + 7) & ~7
+
+
+class DateIndex:
+    """Dates of a cached series, decoded only when read."""
+
+    def __init__(self, offsets, blob):
+        self.offsets = offsets   # memoryview of uint64, rows + 1 entries
+        self.blob = blob
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("Index out of bounds")
+        return bytes(self.blob[self.offsets[i]:self.offsets[i + 1]]).decode("utf-8")
+
+    def __iter__(self):
+        # One decode for the whole column is much faster than one per date
+        n = len(self)
+        if not n:
+            return
+        raw = bytes(self.blob[:self.offsets[n]])
+        text = raw.decode("utf-8")
+        if len(text) != len(raw):
+            # Non-ASCII dates: byte offsets are not string offsets
+            for i in range(n):
+                yield self[i]
+            return
+        offsets = self.offsets.tolist()
+        for i in range(n):
+            yield text[offsets[i]:offsets[i + 1]]
+
+
+def write_cache(series, path, source_stat):
+    """Write series as the binary cache of the CSV at source path."""
+    dates = [d.encode("utf-8") for d in series.dates]
+    offsets = array("Q", [0])
+    total = 0
+    for d in dates:
+        total += len(d)
+        offsets.append(total)
+    header = _HEADER.pack(MAGIC, VERSION, _LITTLE, source_stat.st_size,
+                          source_stat.st_mtime_ns, series.size(), total)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(header)
+        f.write(b"\0" * (_align(len(header)) - len(header)))
+        for name in COLUMNS:
+            f.write(memoryview(series.columns[name]).cast("B"))
+        f.write(offsets.tobytes())
+        f.write(b"".join(dates))
+    os.replace(tmp_path, path)
+
+
+def read_cache(path, source_stat):
+    """Memory-map the cache; None if it is missing or stale for source_stat."""
+    try:
+        with open(path, "rb") as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):   # missing, or empty (can't map 0 bytes)
+        return None
+    if len(mm) < _HEADER.size:
+        mm.close()
+        return None
+    magic, version, little, size, mtime_ns, rows, date_bytes = _HEADER.unpack_from(mm)
+    offset = _align(_HEADER.size)
+    if (magic != MAGIC or version != VERSION or little != _LITTLE
+            or size != source_stat.st_size or mtime_ns != source_stat.st_mtime_ns
+            or len(mm) != offset + 8 * rows * (len(COLUMNS) + 1) + 8 + date_bytes):
+        mm.close()   # stale, truncated or corrupt
+        return None
+
+    # Read-only views straight into the mapped pages: nothing is copied, and
+    # processes opening the same cache share those pages
+    view = memoryview(mm)
+    series = PriceSeries()
+    for name in COLUMNS:
+        series.columns[name] = view[offset:offset + 8 * rows].cast("d")
+        offset += 8 * rows
+    offsets = view[offset:offset + 8 * (rows + 1)].cast("Q")
+    offset += 8 * (rows + 1)
+    series.dates = DateIndex(offsets, view[offset:offset + date_bytes])
+    return series
+
+
+def load_cached(path, use_cache=True):
+    """load_csv, but reuse (or create) the binary cache next to the file.
+
+    A cached series has read-only memoryview columns; stats["cached"] tells
+    whether the cache was used.
+    """
+    start = time.perf_counter()
+    source_stat = os.stat(path)
+    series = read_cache(cache_path(path), source_stat) if use_cache else None
+    if series is not None:
+        seconds = time.perf_counter() - start
+        series.stats.update(rows=series.size(), bytes=source_stat.st_size, seconds=seconds,
+                            rows_per_s=series.size() / seconds if seconds else 0.0, cached=True)
+        return series
+
+    series = load_csv(path)
+    series.stats["cached"] = False
+    if use_cache:
+        try:
+            write_cache(series, cache_path(path), source_stat)
+        except OSError:
+            pass   # read-only folder: still works, just without the cache
+    return series
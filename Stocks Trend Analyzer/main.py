@@ -1,16 +1,18 @@
 import customtkinter as ctk
 import tkinter as tk
 from tkinter import filedialog, messagebox
-import csv
 import os
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 
+from chart_renderer import ChartRenderer
 from dsa.array_list import ArrayList
+from loaders.price_cache import load_cached
 from algorithms.trend_analysis import TrendAnalysis
 from algorithms.moving_average import MovingAverage
 from algorithms.max_profit import MaxProfit
 from algorithms.local_high_low import LocalHighLow
+from algorithms.numpy_engine import NumpyEngine, AVAILABLE as NUMPY_AVAILABLE
 
 class StockAnalyzerApp:
     def __init__(self, master):
@@ -23,7 +25,11 @@ class StockAnalyzerApp:
         # Variables
         self.prices = ArrayList()
         self.dates = ArrayList()
+        self.series = None  # all OHLCV columns of the loaded file
         self.window_size = tk.IntVar(value=5)
+        self.swing_window = tk.IntVar(value=1)
+        self.min_prominence = tk.DoubleVar(value=0.0)
+        self.engine = tk.StringVar(value="NumPy" if NUMPY_AVAILABLE else "Python")
 
         # ------------------ LAYOUT -------------------
         self.main_frame = ctk.CTkFrame(master)
@@ -46,6 +52,19 @@ class StockAnalyzerApp:
         self.window_entry = ctk.CTkEntry(self.left_panel, textvariable=self.window_size, width=80)
         self.window_entry.pack(pady=5)
 
+        # Window 1 / prominence 0 marks every local high/low
+        ctk.CTkLabel(self.left_panel, text="Swing Window / Min Prominence:", anchor="w").pack(pady=5)
+        swing_row = ctk.CTkFrame(self.left_panel, fg_color="transparent")
+        swing_row.pack(pady=5)
+        self.swing_entry = ctk.CTkEntry(swing_row, textvariable=self.swing_window, width=60)
+        self.swing_entry.pack(side="left", padx=5)
+        self.prominence_entry = ctk.CTkEntry(swing_row, textvariable=self.min_prominence, width=80)
+        self.prominence_entry.pack(side="left", padx=5)
+
+        ctk.CTkLabel(self.left_panel, text="Engine:", anchor="w").pack(pady=5)
+        engines = ["Python", "NumPy"] if NUMPY_AVAILABLE else ["Python"]
+        ctk.CTkOptionMenu(self.left_panel, values=engines, variable=self.engine, width=120).pack(pady=5)
+
         ctk.CTkButton(self.left_panel, text="Analyze Trends", command=self.analyze, width=220).pack(pady=15)
 
         ctk.CTkButton(self.left_panel, text="Save Chart", command=self.save_chart, width=220).pack(pady=15)
@@ -68,6 +87,7 @@ class StockAnalyzerApp:
 
         self.canvas = FigureCanvasTkAgg(self.figure, self.right_panel)
         self.canvas.get_tk_widget().pack(fill="both", expand=True)
+        self.renderer = ChartRenderer(self.ax, self.canvas)
 
     # ------------------ FUNCTIONS -------------------
 
@@ -76,16 +96,16 @@ class StockAnalyzerApp:
         if not file_path:
             return
         try:
-            with open(file_path, "r") as csvfile:
-                reader = csv.DictReader(csvfile)
-                self.prices.clear()
-                self.dates.clear()
+            # Binary cache next to the CSV makes reopening a big file near-instant
+            self.series = load_cached(file_path)
+            # Wrap the columns instead of copying them: from the cache they
+            # are views into the mapped file, and the dates decode on access
+            self.prices = ArrayList(self.series.prices())
+            self.dates = ArrayList(self.series.dates)
 
-                for row in reader:
-                    self.dates.append(row["Date"])
-                    self.prices.append(float(row["Close"]))
-
-            messagebox.showinfo("Success", f"Loaded {self.prices.size()} records.")
+            stats = self.series.stats
+            messagebox.showinfo("Success", f"Loaded {self.prices.size()} records "
+                                           f"({stats['rows_per_s']:,.0f} rows/s).")
 
         except Exception as e:
             messagebox.showerror("Error", f"Failed to load CSV: {e}")
@@ -103,44 +123,49 @@ class StockAnalyzerApp:
             messagebox.showwarning("Warning", "Window size must be positive.")
             return
 
-        # Trend detection
-        trend_module = TrendAnalysis(self.prices)
-        trends = trend_module.detect_trends()
-
-        # Moving Average
-        ma_module = MovingAverage(window)
-        moving_avg = ma_module.calculate(
-            [self.prices.get(i) for i in range(self.prices.size())]
-        )
-
-        # Max Profit
-        price_list = [self.prices.get(i) for i in range(self.prices.size())]
-        max_profit_module = MaxProfit(price_list)
-        buy_day, sell_day, profit = max_profit_module.best_interval()
-
-        # Local Extremes
-        lh_module = LocalHighLow(price_list)
-        extremes = lh_module.find_local_extremes()
-
-        # Plot
-        self.ax.clear()
-        x_vals = list(range(self.prices.size()))
-        y_vals = price_list
-
-        self.ax.plot(x_vals, y_vals, label="Close Price")
-        self.ax.plot(x_vals, moving_avg, label=f"{window}-Day MA")
-
-        # Buy/Sell Markers
-        self.ax.scatter(buy_day, y_vals[buy_day], color="green", marker="^", s=100)
-        self.ax.scatter(sell_day, y_vals[sell_day], color="red", marker="v", s=100)
-
-        # High / Low Points
-        for idx, kind, price in extremes:
-            self.ax.scatter(idx, price, color="purple" if kind == "High" else "brown")
+        try:
+            swing_window = int(self.swing_entry.get())
+            min_prominence = float(self.prominence_entry.get())
+            if swing_window < 1 or min_prominence < 0:
+                raise ValueError
+        except ValueError:
+            messagebox.showwarning("Warning", "Swing window must be positive and prominence not negative.")
+            return
 
-        self.ax.set_title("Stock Trend Analysis")
-        self.ax.legend()
-        self.canvas.draw()
+        # The analyses only read the prices, so use the sequence behind the
+        # ArrayList (a memoryview into the cache file when it was used)
+        price_list = self.prices.data
+
+        if self.engine.get() == "NumPy":
+            # Same results as the classes below, computed on whole arrays
+            engine = NumpyEngine(price_list)
+            trends = engine.detect_trends()
+            moving_avg = engine.moving_average(window)
+            buy_day, sell_day, profit = engine.best_interval()
+            extremes = engine.find_local_extremes()
+        else:
+            # Trend detection
+            trend_module = TrendAnalysis(self.prices)
+            trends = trend_module.detect_trends()
+
+            # Moving Average
+            ma_module = MovingAverage(window)
+            moving_avg = ma_module.calculate(price_list)
+
+            # Max Profit
+            max_profit_module = MaxProfit(price_list)
+            buy_day, sell_day, profit = max_profit_module.best_interval()
+
+            # Local Extremes
+            lh_module = LocalHighLow(price_list)
+            extremes = lh_module.find_local_extremes()
+
+        if swing_window > 1 or min_prominence > 0:
+            # Only the significant swing points instead of every wiggle
+            extremes = LocalHighLow(price_list).find_swing_points(swing_window, min_prominence)
+
+        # Plot (artists are reused and lines downsampled to the chart width)
+        self.renderer.render(price_list, moving_avg, window, buy_day, sell_day, extremes)
 
         # Update Labels
         self.buy_label.configure(text=f"Buy Day: {buy_day}")
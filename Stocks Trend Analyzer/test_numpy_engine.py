@@ -0,0 +1,54 @@
+import random
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from algorithms.moving_average import MovingAverage
+from algorithms.numpy_engine import NumpyEngine, verify
+
+
+def _prices(n, seed=1, scale=1.0):
+    rng = random.Random(seed)
+    prices = [100.0 * scale]
+    for _ in range(n - 1):
+        prices.append(round(prices[-1] * (1 + rng.gauss(0, 0.02)), 2))
+    return prices
+
+
+@pytest.mark.parametrize("window", [1, 5, 20, 250])
+def test_engines_agree(window):
+    assert verify(_prices(5000), window) == []
+
+
+def test_moving_average_does_not_drift_on_long_high_priced_series():
+    prices = _prices(200000, seed=2, scale=1000.0)
+    expected = MovingAverage(20).calculate(prices)
+    result = NumpyEngine(prices).moving_average(20)
+    assert np.allclose(result, expected, rtol=1e-12, atol=0)
+    # A plain average of the last window, no running sums involved
+    assert abs(result[-1] - sum(prices[-20:]) / 20) <= 1e-12 * result[-1]
+
+
+def test_moving_average_short_series():
+    prices = [1.0, 2.0, 3.0]
+    assert list(NumpyEngine(prices).moving_average(5)) == MovingAverage(5).calculate(prices)
+    assert list(NumpyEngine([]).moving_average(5)) == []
+
+
+def test_engines_agree_on_a_csv_with_short_rows(tmp_path):
+    from loaders.csv_loader import load_csv
+
+    path = tmp_path / "short.csv"
+    rows = ["Date,Open,High,Low,Close,Volume"]
+    for i, price in enumerate(_prices(300, seed=4)):
+        if i % 7 == 3:
+            rows.append(f"d{i},{price},{price},100")   # short: no Low or Close
+        else:
+            rows.append(f"d{i},{price},{price},{price},{price},100")
+    path.write_text("\n".join(rows) + "\n")
+
+    series = load_csv(str(path))
+    assert series.stats["short_rows"] == series.stats["dropped_rows"] == 43
+    assert series.size() == 257 and "d3" not in series.dates
+    assert verify(series.prices(), 5) == []
@@ -0,0 +1,23 @@
+import random
+import statistics
+
+from algorithms.window_stats import RollingStd
+
+
+def test_rolling_std_is_exactly_zero_on_a_flat_window():
+    assert RollingStd(3).calculate([3, 1, 1, 1])[-1] == 0.0
+    # A large price leaving the window cancels a large m2
+    assert RollingStd(3).calculate([1000, 1, 1, 1, 1])[-2:] == [0.0, 0.0]
+    assert RollingStd(4).calculate([5.1] * 10 + [7.3, 0.2] + [42.17] * 6)[-1] == 0.0
+
+
+def test_rolling_std_matches_stdev_of_each_window():
+    rng = random.Random(5)
+    prices = [100.0]
+    for _ in range(20000):
+        prices.append(round(prices[-1] * (1 + rng.gauss(0, 0.02)), 2))
+    for window in (2, 20, 250):
+        result = RollingStd(window).calculate(prices)
+        for i in range(window, len(prices), 97):
+            expected = statistics.stdev(prices[i - window + 1:i + 1])
+            assert abs(result[i] - expected) <= 1e-12 * max(expected, 1.0)